@@ -1,10 +1,12 @@
 # src\mcgrp_app\core\editing.py
 
+import numpy as np
 import pandas as pd
-from typing import List, Tuple
+import shapely
+from typing import List, Optional, Tuple
 from shapely.geometry import Point, LineString
 
-from ..utils import FieldConfigType, FieldsManager, GeoCalculator, GraphState
+from ..utils import FieldConfigType, FieldsManager, GeoCalculator, GraphState, TooltipFormatter
 
 class GraphEditor:
     """
@@ -22,73 +24,84 @@ class GraphEditor:
         """
         if template_df is None or template_df.empty:
             return new_df
+
+        # Lista de colunas alvo calculada uma única vez por template
+        template_cols = list(template_df.columns)
     
         # Garante que todas as colunas do template existam no novo
-        for col in template_df.columns:
+        for col in template_cols:
             if col not in new_df.columns:
                 new_df[col] = None
         
         # Ordena colunas para igualar ao template
-        common_cols = [c for c in template_df.columns if c in new_df.columns]
-        new_df = new_df[common_cols].copy()
+        new_df = new_df.reindex(columns=template_cols)
 
         # Tenta alinhar tipos para colunas que são totalmente nulas/NA no new_df
-        for col in new_df.columns:
-            if new_df[col].isna().all() and not template_df[col].isna().all():
+        for col in template_cols:
+            target_dtype = template_df[col].dtype
+            if new_df[col].dtype == target_dtype:
+                continue        # Já está no tipo do template: o cast seria inócuo
+            if not new_df[col].isna().all():
+                continue
+            # Colunas int/bool NumPy não guardam NA: template não vazio sempre tem valores
+            if (isinstance(target_dtype, np.dtype) and target_dtype.kind in 'biu') or not template_df[col].isna().all():
                 try:
                     # Tenta castar a coluna de Nones para o tipo da coluna original (ex: float64, Int64)
-                    new_df[col] = new_df[col].astype(template_df[col].dtype)
+                    new_df[col] = new_df[col].astype(target_dtype)
                 except Exception:
                     pass        # Se falhar, deixa como object/None
         
         return new_df
     
-    def _preformat_street_tooltip(self, row_dict: dict) -> str:
-        """Helper para formatar o tooltip de uma rua."""
-        try:
-            oneway = (str(row_dict.get('oneway', 'no')) or 'no').lower()
-            if oneway in ['yes', '1', 'true']:
-                header = f"<b>Arco:</b> {row_dict.get('arc_index', '?')} (De: {row_dict.get('from_node', '?')}, Para: {row_dict.get('to_node', '?')})"
-            else:
-                header = f"<b>Aresta:</b> {row_dict.get('edge_index', '?')}"
-            
-            rua = row_dict.get('name', 'desconhecida')
-            bairro = row_dict.get('bairro', 'N/A')
-
-            dist_km = row_dict.get('total_dist', 0.0)
-            dist_fmt = f"{dist_km:.3f} km"
-            row_dict['total_dist_fmt'] = dist_fmt
-
-            custo_val = row_dict.get('custo_travessia')
-            custo = f"{int(custo_val)} s" if pd.notna(custo_val) and custo_val >= 0 else "N/A"
-            
-            return (
-                f"{header}"
-                f"<br><b>Rua:</b> {rua}"
-                f"<br><b>Bairro:</b> {bairro}"
-                f"<br><b>Comprimento:</b> {dist_fmt}"
-                f"<br><b>Custo Travessia:</b> {custo}"
-            )
-        except Exception:
-            return "Erro no Tooltip"
-        
-    def _preformat_node_tooltip(self, row_dict: dict) -> str:
-        """Helper para formatar o tooltip de um nó."""
-        try:
-            node_idx = row_dict.get('node_index', '?')
-            if node_idx != '?':
-                node_idx = int(node_idx)
-
-            if row_dict.get('depot') == 'yes':
-                return f"<b>Depósito:</b> {node_idx}"
-            
-            custo_serv = int(row_dict.get('custo_servico', 0))
-            return (
-                f"<b>Nó:</b> {node_idx}" 
-                f"<br><b>Custo de serviço:</b> {custo_serv}s"
-            )
-        except Exception:
-            return "Erro no Tooltip"
+    @staticmethod
+    def _ids_mask(series: pd.Series, ids: list) -> np.ndarray:
+        """
+        Máscara das linhas cujo valor está em ids (poucos IDs).
+        Comparações diretas no array são bem mais rápidas que isin (tabela hash) para listas pequenas.
+        """
+        values = series.to_numpy()
+        if not np.issubdtype(values.dtype, np.number):
+            return series.isin(ids).to_numpy()
+
+        mask = np.zeros(len(values), dtype=bool)
+        for value in ids:
+            mask |= (values == value)
+        return mask
+
+    def _replace_rows(self, df: pd.DataFrame, remove_mask: np.ndarray, new_rows: List[dict]) -> pd.DataFrame:
+        """
+        Remove as linhas marcadas em remove_mask e anexa new_rows (dicts) ao final (índice resetado).
+        As novas linhas são alinhadas ao df e concatenadas, junto dos trechos mantidos
+        (fatias contíguas, sem cópia), de uma só vez: o DataFrame é copiado uma única vez por edição.
+        """
+        new_df = self._align_dataframe_structure(pd.DataFrame(new_rows), df)
+
+        bounds = np.concatenate(([-1], np.flatnonzero(remove_mask), [len(df)]))
+        kept_slices = [df.iloc[start + 1:end] for start, end in zip(bounds[:-1], bounds[1:]) if end > start + 1]
+        # Sem trechos mantidos, usa a fatia vazia para preservar os tipos originais no concat
+        return pd.concat((kept_slices or [df.iloc[:0]]) + [new_df], ignore_index=True)
+
+    def _refresh_street_tooltips(self, df: pd.DataFrame, previous: pd.DataFrame, current: bool) -> pd.Series:
+        """
+        Reformata o tooltip apenas das ruas cujos campos (em 'previous', alinhado por índice)
+        mudaram ou que ainda não possuem tooltip. As demais mantêm o texto atual.
+        Se os tooltips existentes não estiverem em dia ('current' False), reformata todos.
+        """
+        if not current or 'tooltip_html' not in df.columns:
+            return TooltipFormatter.street_tooltips(df)
+
+        dirty = df['tooltip_html'].isna().to_numpy().copy()
+        for col in previous.columns:
+            old, new = previous[col], df[col]
+            if old.dtype != new.dtype:
+                # Mudança de tipo altera a formatação (ex: 1 -> 1.0)
+                return TooltipFormatter.street_tooltips(df)
+            dirty |= ~((old == new) | (old.isna() & new.isna())).to_numpy()
+
+        tooltips = df['tooltip_html'].copy()
+        if dirty.any():
+            tooltips[dirty] = TooltipFormatter.street_tooltips(df[dirty])
+        return tooltips
 
     def _find_split_index_and_snapped_point(self, line_geom: LineString, click_point: Point) -> Tuple[int, Point]:
         """
@@ -99,44 +112,157 @@ class GraphEditor:
         distance_along_line = line_geom.project(click_point)
         snapped_point = line_geom.interpolate(distance_along_line)
         
-        coords = list(line_geom.coords)
+        coords = np.asarray(line_geom.coords, dtype=np.float64)[:, :2]
+        
+        # Distância do ponto a cada segmento (projeção analítica, sem criar geometrias)
+        start, seg = coords[:-1], coords[1:] - coords[:-1]
+        rel = np.asarray(snapped_point.coords[0][:2], dtype=np.float64) - start
         
-        # Encontra o segmento correto
-        for i in range(len(coords) - 1):
-            # Cria uma geometria para o segmento atual
-            segment = LineString([coords[i], coords[i+1]])
-            
-            # Tolerância pequena para float
-            if segment.distance(snapped_point) < 1e-8:
-                return i + 1, snapped_point
+        seg_len2 = (seg * seg).sum(axis=1)
+        t = np.clip(np.divide((seg * rel).sum(axis=1), seg_len2, out=np.zeros_like(seg_len2), where=seg_len2 > 0), 0, 1)
+        dists = np.hypot(*(rel - t[:, None] * seg).T)
+        
+        # Primeiro segmento dentro da tolerância (pequena, para float)
+        hits = np.flatnonzero(dists < 1e-8)
+        if hits.size:
+            return int(hits[0]) + 1, snapped_point
         
         # Fallback: se algo der errado, insere no final
         return len(coords), snapped_point
 
-    def _calculate_line_length(self, coords_list: List[Tuple[float, float]]) -> float:
-        """Calcula o comprimento total (em metros) de uma lista de coordenadas."""
-        total_dist = 0.0
-        for i in range(len(coords_list) - 1):
-            total_dist += GeoCalculator.haversine_distance(coords_list[i], coords_list[i+1])
-        return total_dist
-
-    def _calculate_segment_angles(self, coords_list: List[Tuple[float, float]]) -> List[float]:
-        """Calcula o azimute de cada segmento em uma lista de coordenadas."""
-        angles = []
-        for i in range(len(coords_list) - 1):
-            angle = GeoCalculator.azimuth(coords_list[i], coords_list[i+1])
-            angles.append(angle)
-        return angles
-        
+    @staticmethod
+    def _build_linestrings(coords_parts: List[np.ndarray]) -> np.ndarray:
+        """
+        Constrói várias LineStrings (uma por array de coordenadas) em uma única chamada
+        vetorizada do Shapely, em vez de um construtor por geometria.
+        """
+        sizes = [len(part) for part in coords_parts]
+        return shapely.linestrings(np.vstack(coords_parts), indices=np.repeat(np.arange(len(sizes)), sizes))
+
+    def _calculate_line_metrics(self, coords_list: List[Tuple[float, float]]) -> Tuple[float, np.ndarray]:
+        """
+        Calcula, numa única passada, o comprimento total (em metros) e o
+        azimute de cada segmento de uma lista de coordenadas.
+        """
+        if len(coords_list) < 2:
+            return 0.0, np.empty(0, dtype=np.float64)
+
+        coords = np.asarray(coords_list, dtype=np.float64)
+        distances, angles = GeoCalculator.haversine_and_azimuth_vec(coords[:-1], coords[1:])
+        return float(distances.sum()), angles
+
     def _get_next_index(self, df: pd.DataFrame, column: str) -> int:
         """Retorna o próximo índice disponível para uma coluna."""
         if df.empty or column not in df.columns:
             return 1
-        valid_series = pd.to_numeric(df[column], errors='coerce').dropna()
+
+        series = df[column]
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            # Caminho rápido: coluna já numérica, sem reconversão
+            values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            valid = values[~np.isnan(values)]
+            return int(valid.max()) + 1 if valid.size else 1
+
+        valid_series = pd.to_numeric(series, errors='coerce').dropna()
         if valid_series.empty:
             return 1
         return int(valid_series.max()) + 1
 
+    def _next_indices(self, df: pd.DataFrame) -> Tuple[int, int, int]:
+        """
+        Retorna (próximo id, próximo edge_index, próximo arc_index) de uma só vez.
+        Com as três colunas numéricas, o máximo sai de uma única redução NumPy.
+        """
+        columns = ['id', 'edge_index', 'arc_index']
+        numeric = not df.empty and all(
+            col in df.columns
+            and pd.api.types.is_numeric_dtype(df[col])
+            and not pd.api.types.is_bool_dtype(df[col])
+            for col in columns
+        )
+        if not numeric:
+            return tuple(self._get_next_index(df, col) for col in columns)
+
+        values = df[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        maxima = np.fmax.reduce(values, axis=0)         # fmax ignora NaN
+        return tuple(1 if np.isnan(value) else int(value) + 1 for value in maxima)
+
+    def _ensure_counters(self, state: GraphState) -> None:
+        """Preenche, numa única varredura de data_streets, os contadores ainda não calculados."""
+        if None not in (state.next_street_id, state.next_edge_index, state.next_arc_index):
+            return
+
+        next_id, next_edge, next_arc = self._next_indices(state.data_streets)
+        if state.next_street_id is None:
+            state.next_street_id = next_id
+        if state.next_edge_index is None:
+            state.next_edge_index = next_edge
+        if state.next_arc_index is None:
+            state.next_arc_index = next_arc
+
+    def _get_next_street_id(self, state: GraphState) -> int:
+        """Retorna o próximo ID de rua livre, usando o contador do estado quando disponível."""
+        self._ensure_counters(state)
+        return state.next_street_id
+
+    def _get_next_edge_index(self, state: GraphState) -> int:
+        """Retorna o próximo edge_index livre, usando o contador do estado quando disponível."""
+        self._ensure_counters(state)
+        return state.next_edge_index
+
+    def _get_next_arc_index(self, state: GraphState) -> int:
+        """Retorna o próximo arc_index livre, usando o contador do estado quando disponível."""
+        self._ensure_counters(state)
+        return state.next_arc_index
+
+    @staticmethod
+    def _advance_index_counter(counter: Optional[int], removed: list, assigned: list) -> Optional[int]:
+        """
+        Atualiza um contador de índice após uma edição (ruas removidas + novos índices atribuídos).
+        Retorna None (recalcular depois) se o maior índice foi removido sem substituto.
+        """
+        if counter is None:
+            return None
+        if assigned:
+            return max(counter, max(assigned) + 1)
+        if any(pd.notna(value) and value == counter - 1 for value in removed):
+            return None
+        return counter
+
+    @staticmethod
+    def _remap_ids(series: pd.Series, old_ids, new_ids) -> pd.Series:
+        """
+        Equivalente vetorizado de series.map(dict(zip(old_ids, new_ids))).
+        Usa busca binária (searchsorted) em vez de consultas ao dicionário por elemento.
+        Valores ausentes no mapa viram NaN; tipos não numéricos caem no .map original.
+        """
+        values = series.to_numpy()
+        old = np.asarray(old_ids)
+        new = np.asarray(new_ids)
+
+        is_numeric = (
+            np.issubdtype(values.dtype, np.number) and
+            np.issubdtype(old.dtype, np.number) and
+            np.issubdtype(new.dtype, np.number)
+        )
+        if not is_numeric or len(values) == 0 or len(old) == 0 or np.isnan(old).any():
+            return series.map(dict(zip(old_ids, new_ids)))
+
+        # Ordenação estável: em chaves duplicadas prevalece a última (como no dict)
+        order = np.argsort(old, kind='stable')
+        sorted_old = old[order]
+        sorted_new = new[order]
+
+        pos = np.searchsorted(sorted_old, values, side='right') - 1
+        pos_safe = np.clip(pos, 0, None)
+        found = (pos >= 0) & (sorted_old[pos_safe] == values)
+
+        mapped = sorted_new[pos_safe]
+        if not found.all():
+            mapped = np.where(found, mapped, np.nan)
+
+        return pd.Series(mapped, index=series.index, name=series.name)
+
     def _reindex_dfs(self, data_streets: pd.DataFrame, data_points: pd.DataFrame, map_streets: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
         """
         Re-indexa os IDs das ruas (1 a N) e propaga para os pontos.
@@ -148,26 +274,53 @@ class GraphEditor:
         data_streets = data_streets.reset_index(drop=True)
         
         # Cria mapa de ID antigo -> ID novo
-        data_streets['final_id'] = data_streets.index + 1
-        id_map = dict(zip(data_streets['id'], data_streets['final_id']))
+        old_ids = data_streets['id'].to_numpy()
+        new_ids = np.arange(1, len(data_streets) + 1)
         
-        data_streets['id'] = data_streets['final_id']
-        data_streets = data_streets.drop(columns='final_id')
+        data_streets['id'] = new_ids
         
-        # Pontos
-        data_points['from_line_id'] = data_points['from_line_id'].map(id_map)
-        data_points = data_points.dropna(subset=['from_line_id'])
-        data_points = data_points.reset_index(drop=True)
+        # Pontos (órfãos são descartados antes do remapeamento: a coluna não passa por float/NaN)
+        data_points = data_points[data_points['from_line_id'].isin(old_ids)].reset_index(drop=True)
+        data_points['from_line_id'] = self._remap_ids(data_points['from_line_id'], old_ids, new_ids)
 
         # Ruas de MAPA
-        map_streets['final_id'] = map_streets['id'].map(id_map)
-        map_streets = map_streets.dropna(subset=['final_id'])
-        map_streets['id'] = map_streets['final_id']
-        map_streets = map_streets.drop(columns='final_id')
-        map_streets = map_streets.reset_index(drop=True)
+        map_streets = map_streets[map_streets['id'].isin(old_ids)].reset_index(drop=True)
+        map_streets['id'] = self._remap_ids(map_streets['id'], old_ids, new_ids)
 
         return data_streets, data_points, map_streets
     
+    @staticmethod
+    def _restore_node_attributes(map_points: pd.DataFrame, old_state: pd.DataFrame) -> pd.DataFrame:
+        """
+        Restaura em map_points os atributos de old_state (casados por 'node_index'),
+        onde o valor antigo não é nulo (map_points é modificado). Equivale a
+        set_index + update + reset_index, mas com um único get_indexer em vez do round-trip de índice.
+        """
+        positions = pd.Index(old_state['node_index']).get_indexer(map_points['node_index'])
+        found = positions >= 0
+
+        for col in old_state.columns:
+            if col == 'node_index' or col not in map_points.columns or not found.any():
+                continue
+            values = old_state[col].to_numpy()[positions]
+            mask = found & pd.notna(values)
+            if mask.any():
+                map_points.loc[mask, col] = values[mask]
+
+        # Mantém a ordem de colunas do round-trip original ('node_index' primeiro)
+        return map_points[['node_index'] + [c for c in map_points.columns if c != 'node_index']]
+
+    @staticmethod
+    def _sort_by_id(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Ordena o DataFrame pela coluna 'id' (índice resetado).
+        Usa argsort estável direto no array, já que os IDs chegam quase ordenados após as edições.
+        """
+        ids = df['id'].to_numpy()
+        if not np.issubdtype(ids.dtype, np.number):
+            return df.sort_values('id').reset_index(drop=True)
+        return df.take(np.argsort(ids, kind='stable')).reset_index(drop=True)
+
     def finalize_reindexing(self, state: GraphState) -> GraphState:
         """
         Realiza a re-indexação final de todos os identificadores do grafo (1 a N).
@@ -178,20 +331,23 @@ class GraphEditor:
         # 1. Re-indexação de rua
         
         # Ordena para garantir determinismo
-        state.data_streets = state.data_streets.sort_values('id').reset_index(drop=True)
-        state.map_streets = state.map_streets.sort_values('id').reset_index(drop=True)
+        state.data_streets = self._sort_by_id(state.data_streets)
+        state.map_streets = self._sort_by_id(state.map_streets)
+
+        # Campos do tooltip alterados por esta re-indexação (para atualização incremental)
+        tooltip_cols = [c for c in ('edge_index', 'arc_index', 'from_node', 'to_node') if c in state.map_streets.columns]
+        tooltip_inputs = state.map_streets[tooltip_cols]
         
         # Cria mapa de IDs antigos -> novos
-        old_ids = state.data_streets['id'].tolist()
-        new_ids = list(range(1, len(state.data_streets) + 1))
-        street_id_map = dict(zip(old_ids, new_ids))
+        old_ids = state.data_streets['id'].to_numpy()
+        new_ids = np.arange(1, len(state.data_streets) + 1)
         
         # Aplica novos IDs
         state.data_streets['id'] = new_ids
         state.map_streets['id'] = new_ids
         
         # Atualiza referências nos pontos
-        state.data_points['from_line_id'] = state.data_points['from_line_id'].map(street_id_map)
+        state.data_points['from_line_id'] = self._remap_ids(state.data_points['from_line_id'], old_ids, new_ids)
         
         # 2. Re-indexação de Edge/Arc Index
 
@@ -210,42 +366,48 @@ class GraphEditor:
         state.map_streets.loc[mask_edges, 'edge_index'] = state.data_streets.loc[mask_edges, 'edge_index'].values
         state.map_streets.loc[mask_arcs, 'arc_index'] = state.data_streets.loc[mask_arcs, 'arc_index'].values
 
+        # Contadores passam a refletir a numeração sequencial
+        state.next_street_id = len(state.data_streets) + 1
+        state.next_edge_index = int(n_edges) + 1 if n_edges > 0 else None
+        state.next_arc_index = int(n_arcs) + 1 if n_arcs > 0 else None
+
         # 3. Re-indexação de nós
 
         # Obtém todos os node_index únicos presentes no data_points
         unique_nodes = sorted(state.data_points['node_index'].unique())
-        node_id_map = {old: new for new, old in enumerate(unique_nodes, 1)}
+        new_nodes = np.arange(1, len(unique_nodes) + 1)
         
         # Aplica mapa nos Pontos
-        state.data_points['node_index'] = state.data_points['node_index'].map(node_id_map)
+        state.data_points['node_index'] = self._remap_ids(state.data_points['node_index'], unique_nodes, new_nodes)
         
         # Aplica mapa nas Ruas (from_node, to_node)
-        state.data_streets['from_node'] = state.data_streets['from_node'].map(node_id_map)
-        state.data_streets['to_node'] = state.data_streets['to_node'].map(node_id_map)
+        state.data_streets['from_node'] = self._remap_ids(state.data_streets['from_node'], unique_nodes, new_nodes)
+        state.data_streets['to_node'] = self._remap_ids(state.data_streets['to_node'], unique_nodes, new_nodes)
         
-        state.map_streets['from_node'] = state.map_streets['from_node'].map(node_id_map)
-        state.map_streets['to_node'] = state.map_streets['to_node'].map(node_id_map)
+        state.map_streets['from_node'] = self._remap_ids(state.map_streets['from_node'], unique_nodes, new_nodes)
+        state.map_streets['to_node'] = self._remap_ids(state.map_streets['to_node'], unique_nodes, new_nodes)
         
         # 4. Reconstrói Map Points
 
         # Salva metadados visuais antigos
         old_map_state = state.map_points[['node_index', 'eh_requerido', 'depot', 'custo_servico', 'demanda']].copy()
-        old_map_state['node_index'] = old_map_state['node_index'].map(node_id_map)
-        old_map_state = old_map_state.dropna(subset=['node_index']).set_index('node_index')
+        old_map_state['node_index'] = self._remap_ids(old_map_state['node_index'], unique_nodes, new_nodes)
+        old_map_state = old_map_state.dropna(subset=['node_index'])
         
         # Recria visualização
         final_map_points = GeoCalculator.create_map_points(state.data_points)
         final_map_points = FieldsManager.ensure_fields_exist(final_map_points, FieldConfigType.EXTENDED)
         
         # Restaura metadados
-        final_map_points = final_map_points.set_index('node_index')
-        final_map_points.update(old_map_state)
-        final_map_points = final_map_points.reset_index()
+        final_map_points = self._restore_node_attributes(final_map_points, old_map_state)
         
         # Tooltips
-        final_map_points['tooltip_html'] = final_map_points.apply(lambda row: self._preformat_node_tooltip(row.to_dict()), axis=1)
+        final_map_points['tooltip_html'] = TooltipFormatter.node_tooltips(final_map_points)
         state.map_points = final_map_points
-        state.map_streets['tooltip_html'] = state.map_streets.apply(lambda row: self._preformat_street_tooltip(row.to_dict()), axis=1)
+        state.map_streets['tooltip_html'] = self._refresh_street_tooltips(
+            state.map_streets, tooltip_inputs, state.street_tooltips_current
+        )
+        state.street_tooltips_current = True
         
         print("Editor: Re-indexação final concluída.")
         return state
@@ -271,9 +433,14 @@ class GraphEditor:
         new_node_id = new_node_row['node_index']
         new_node_geom = new_node_row['geometry']        # Ponto do clique
 
+        # Máscaras da rua original (reaproveitadas na remoção, evitando novas varreduras)
+        street_data_mask = (state.data_streets['id'] == original_street_id).to_numpy()
+        street_map_mask = (state.map_streets['id'] == original_street_id).to_numpy()
+        street_points_mask = (state.data_points['from_line_id'] == original_street_id).to_numpy()
+
         # Rua Original (A-B)
-        street_data_row = state.data_streets[state.data_streets['id'] == original_street_id].iloc[0]
-        street_map_row = state.map_streets[state.map_streets['id'] == original_street_id].iloc[0]
+        street_data_row = state.data_streets[street_data_mask].iloc[0]
+        street_map_row = state.map_streets[street_map_mask].iloc[0]
         
         # Herança de atributos
         original_eh_requerido = street_data_row.get('eh_requerido', 'no')
@@ -288,20 +455,18 @@ class GraphEditor:
         pt_B_id = street_data_row['to_node']
 
         # Linhas dos Pontos Originais (A e B)
-        points_for_street = state.data_points[
-            state.data_points['from_line_id'] == original_street_id
-        ]
+        points_for_street = state.data_points[street_points_mask]
         pt_A_row = points_for_street[points_for_street['node_index'] == pt_A_id].iloc[0]
         pt_B_row = points_for_street[points_for_street['node_index'] == pt_B_id].iloc[0]
 
         # --- ENCAIXAR NÓ C NA GEOMETRIA VISUAL ---
         map_street_geom = street_map_row.geometry
-        visual_coords = list(map_street_geom.coords)
+        visual_coords = shapely.get_coordinates(map_street_geom)
         
         split_index, snapped_node_geom = self._find_split_index_and_snapped_point(
             map_street_geom, new_node_geom
         )
-        snapped_node_coords = snapped_node_geom.coords[0]
+        snapped_node_coords = shapely.get_coordinates(snapped_node_geom)
         
         # Atualiza a geometria do novo nó para o ponto exato na linha
         new_node_row['geometry'] = snapped_node_geom
@@ -309,30 +474,30 @@ class GraphEditor:
         # --- CALCULAR MÉTRICAS ---
         
         # A-C: do início até o índice de corte + o ponto novo
-        visual_coords_A_C = visual_coords[:split_index] + [snapped_node_coords]
+        visual_coords_A_C = np.vstack([visual_coords[:split_index], snapped_node_coords])
         # C-B: o ponto novo + do índice de corte até o fim
-        visual_coords_C_B = [snapped_node_coords] + visual_coords[split_index:]
+        visual_coords_C_B = np.vstack([snapped_node_coords, visual_coords[split_index:]])
 
         # Geometrias (Dados e Mapa)
-        geom_A_C_data = LineString([pt_A_row.geometry, snapped_node_geom])
-        geom_C_B_data = LineString([snapped_node_geom, pt_B_row.geometry])
-        geom_A_C_map = LineString(visual_coords_A_C)
-        geom_C_B_map = LineString(visual_coords_C_B)
-
-        # Distâncias (em metros e km)
-        dist_A_C_m = self._calculate_line_length(visual_coords_A_C)
-        dist_C_B_m = self._calculate_line_length(visual_coords_C_B)
+        pt_A_coords, pt_B_coords = shapely.get_coordinates([pt_A_row.geometry, pt_B_row.geometry])
+        geom_A_C_data, geom_C_B_data, geom_A_C_map, geom_C_B_map = self._build_linestrings([
+            np.vstack([pt_A_coords, snapped_node_coords]),
+            np.vstack([snapped_node_coords, pt_B_coords]),
+            visual_coords_A_C,
+            visual_coords_C_B
+        ])
+
+        # Distâncias (em metros) e ângulos de cada segmento
+        dist_A_C_m, angles_A_C = self._calculate_line_metrics(visual_coords_A_C)
+        dist_C_B_m, angles_C_B = self._calculate_line_metrics(visual_coords_C_B)
+
+        # Distâncias (em km)
         dist_A_C_km = round(dist_A_C_m / 1000.0, GeoCalculator.PRECISION_DIGITS)
         dist_C_B_km = round(dist_C_B_m / 1000.0, GeoCalculator.PRECISION_DIGITS)
-        
-        # Ângulos (Média)
-        angles_A_C = self._calculate_segment_angles(visual_coords_A_C)
-        angles_C_B = self._calculate_segment_angles(visual_coords_C_B)
 
-        angle_A_C = round(GeoCalculator.mean_angle_deg(angles_A_C), GeoCalculator.PRECISION_DIGITS)
-        angle_C_B = round(GeoCalculator.mean_angle_deg(angles_C_B), GeoCalculator.PRECISION_DIGITS)
-        inv_angle_A_C = round(GeoCalculator.azimuth_inverse(angle_A_C), GeoCalculator.PRECISION_DIGITS)
-        inv_angle_C_B = round(GeoCalculator.azimuth_inverse(angle_C_B), GeoCalculator.PRECISION_DIGITS)
+        # Ângulos (Média)
+        angle_A_C, inv_angle_A_C = GeoCalculator.mean_and_inverse_azimuth(angles_A_C)
+        angle_C_B, inv_angle_C_B = GeoCalculator.mean_and_inverse_azimuth(angles_C_B)
         
         # Custos
         cost_travessia_A_C = GeoCalculator.calculate_traversal_cost(dist_A_C_km, maxspeed)
@@ -342,7 +507,7 @@ class GraphEditor:
         cost_servico_C_B = int(round(cost_travessia_C_B * 1.5))
 
         # --- OBTER NOVOS IDs DE RUA ---
-        id_A_C = int(state.data_streets['id'].max()) + 1
+        id_A_C = self._get_next_street_id(state)
         id_C_B = id_A_C + 1
         
         # Determina Edge ou Arc Index
@@ -351,12 +516,12 @@ class GraphEditor:
         
         if pd.notna(street_data_row.get('edge_index')):
             # É aresta
-            next_edge = self._get_next_index(state.data_streets, 'edge_index')
+            next_edge = self._get_next_edge_index(state)
             edge_idx_A_C = next_edge
             edge_idx_C_B = next_edge + 1
         elif pd.notna(street_data_row.get('arc_index')):
             # É arco
-            next_arc = self._get_next_index(state.data_streets, 'arc_index')
+            next_arc = self._get_next_arc_index(state)
             arc_idx_A_C = next_arc
             arc_idx_C_B = next_arc + 1
 
@@ -366,15 +531,10 @@ class GraphEditor:
         
         # Template comum
         base_street_data = street_data_row.to_dict()
-        base_street_data.update({
-            'edge_index': edge_idx_A_C if edge_idx_A_C != None else None,
-            'arc_index': arc_idx_A_C if arc_idx_A_C != None else None,
-            'eh_requerido': original_eh_requerido
-        })
         
         # Rua A-C (Dados)
-        street_A_C_data = base_street_data.copy()
-        street_A_C_data.update({
+        street_A_C_data = {
+            **base_street_data,
             'id': id_A_C,
             'geometry': geom_A_C_data,
             'total_dist': dist_A_C_km,
@@ -385,11 +545,11 @@ class GraphEditor:
             'edge_index': edge_idx_A_C,
             'arc_index': arc_idx_A_C,
             'eh_requerido': original_eh_requerido
-        })
+        }
         
         # Rua C-B (Dados)
-        street_C_B_data = base_street_data.copy()
-        street_C_B_data.update({
+        street_C_B_data = {
+            **base_street_data,
             'id': id_C_B,
             'geometry': geom_C_B_data,
             'total_dist': dist_C_B_km,
@@ -400,39 +560,32 @@ class GraphEditor:
             'edge_index': edge_idx_C_B,
             'arc_index': arc_idx_C_B,
             'eh_requerido': original_eh_requerido
-        })
+        }
 
-        # Rua A-C (Mapa)
-        street_A_C_map = street_map_row.to_dict()
-        street_A_C_map.update(street_A_C_data)          # Copia métricas
-        street_A_C_map['geometry'] = geom_A_C_map       # Define geometria visual
-        street_A_C_map['tooltip_html'] = self._preformat_street_tooltip(street_A_C_map)
+        # Rua A-C (Mapa): propriedades visuais + métricas + geometria visual
+        base_street_map = street_map_row.to_dict()
+        street_A_C_map = {**base_street_map, **street_A_C_data, 'geometry': geom_A_C_map}
+        street_A_C_map['tooltip_html'] = TooltipFormatter.street_tooltip(street_A_C_map)
         
         # Rua C-B (Mapa)
-        street_C_B_map = street_map_row.to_dict()
-        street_C_B_map.update(street_C_B_data)          # Copia métricas
-        street_C_B_map['geometry'] = geom_C_B_map       # Define geometria visual
-        street_C_B_map['tooltip_html'] = self._preformat_street_tooltip(street_C_B_map)
+        street_C_B_map = {**base_street_map, **street_C_B_data, 'geometry': geom_C_B_map}
+        street_C_B_map['tooltip_html'] = TooltipFormatter.street_tooltip(street_C_B_map)
 
         # --- PREPARAR NOVOS PONTOS (A1, C1, C2, B1) ---
         
         # Ponto A1 (atualizado)
-        pt_A1 = pt_A_row.to_dict()
-        pt_A1.update({
+        pt_A1 = {
+            **pt_A_row.to_dict(),
             'from_line_id': id_A_C,
             'angle': angle_A_C,
             'angle_inv': inv_angle_A_C,
             'distance': 0.0
-        })
+        }
         
-        # Ponto C1 (novo)
-        pt_C1 = new_node_row.to_dict()
-        pt_C1.update({
-            'from_line_id': id_A_C,
+        # Template comum do nó C (C1 e C2)
+        base_pt_C = {
+            **new_node_row.to_dict(),
             'vertex_index': -1,
-            'distance': dist_A_C_km,
-            'angle': None,
-            'angle_inv': None,
             'eh_extremidade': 'yes',
             'eh_unido': 'yes',
             'eh_requerido': req_val,
@@ -443,81 +596,74 @@ class GraphEditor:
             'alt_name': base_alt_name,
             'bairro': base_bairro,
             'id_bairro': base_id_bairro
-        })
+        }
+
+        # Ponto C1 (novo)
+        pt_C1 = {
+            **base_pt_C,
+            'from_line_id': id_A_C,
+            'distance': dist_A_C_km,
+            'angle': None,
+            'angle_inv': None
+        }
 
         # Ponto C2 (novo)
-        pt_C2 = new_node_row.to_dict()
-        pt_C2.update({
+        pt_C2 = {
+            **base_pt_C,
             'from_line_id': id_C_B,
-            'vertex_index': -1,
             'distance': 0.0,
             'angle': angle_C_B,
-            'angle_inv': inv_angle_C_B,
-            'eh_extremidade': 'yes',
-            'eh_unido': 'yes',
-            'eh_requerido': req_val,
-            'custo_servico': new_node_cost,
-            'depot': depot_val,
-            'demanda': demanda_val,
-            'name': base_name,
-            'alt_name': base_alt_name,
-            'bairro': base_bairro,
-            'id_bairro': base_id_bairro
-        })
+            'angle_inv': inv_angle_C_B
+        }
 
         # Ponto B1 (atualizado)
-        pt_B1 = pt_B_row.to_dict()
-        pt_B1.update({
+        pt_B1 = {
+            **pt_B_row.to_dict(),
             'from_line_id': id_C_B,
             'distance': dist_C_B_km,
             'angle': None,
             'angle_inv': None
-        })
+        }
         
         # --- ATUALIZAÇÃO DO ESTADO ---
         
-        # Remove antigo
-        final_data_streets = state.data_streets[state.data_streets['id'] != original_street_id].copy()
-        final_map_streets = state.map_streets[state.map_streets['id'] != original_street_id].copy()
-        final_data_points = state.data_points[state.data_points['from_line_id'] != original_street_id].copy()
-
-        # Adiciona novos (concat)
-        new_streets_df = pd.DataFrame([street_A_C_data, street_C_B_data])
-        new_map_df = pd.DataFrame([street_A_C_map, street_C_B_map])
-        new_points_df = pd.DataFrame([pt_A1, pt_C1, pt_C2, pt_B1])
-
-        new_streets_df = self._align_dataframe_structure(new_streets_df, final_data_streets)
-        new_map_df = self._align_dataframe_structure(new_map_df, final_map_streets)
-        new_points_df = self._align_dataframe_structure(new_points_df, final_data_points)
-
-        final_data_streets = pd.concat([final_data_streets, new_streets_df], ignore_index=True)
-        final_map_streets = pd.concat([final_map_streets, new_map_df], ignore_index=True)
-        final_data_points = pd.concat([final_data_points, new_points_df], ignore_index=True)
+        # Remove antigos e adiciona os novos (alinhados) com uma única cópia por DataFrame
+        final_data_streets = self._replace_rows(state.data_streets, street_data_mask, [street_A_C_data, street_C_B_data])
+        final_map_streets = self._replace_rows(state.map_streets, street_map_mask, [street_A_C_map, street_C_B_map])
+        final_data_points = self._replace_rows(state.data_points, street_points_mask, [pt_A1, pt_C1, pt_C2, pt_B1])
 
         # Re-indexa
         final_data_streets, final_data_points, final_map_streets = self._reindex_dfs(final_data_streets, final_data_points, final_map_streets)
 
         # Mapa de Pontos
-        old_map_points_state = state.map_points[['node_index', 'eh_requerido', 'depot', 'custo_servico', 'demanda']].set_index('node_index')
+        old_map_points_state = state.map_points[['node_index', 'eh_requerido', 'depot', 'custo_servico', 'demanda']]
         final_map_points_df = GeoCalculator.create_map_points(final_data_points)
         final_map_points_df = FieldsManager.ensure_fields_exist(final_map_points_df, FieldConfigType.EXTENDED)
         
-        final_map_points_df = final_map_points_df.set_index('node_index')
-        final_map_points_df.update(old_map_points_state)
-        final_map_points_df = final_map_points_df.reset_index()
+        final_map_points_df = self._restore_node_attributes(final_map_points_df, old_map_points_state)
         
         # Garante atributos do novo nó
         mask_new = final_map_points_df['node_index'] == new_node_id
         final_map_points_df.loc[mask_new, ['eh_requerido', 'depot', 'custo_servico']] = [req_val, depot_val, new_node_cost]
         
-        final_map_points_df['tooltip_html'] = final_map_points_df.apply(lambda row: self._preformat_node_tooltip(row.to_dict()), axis=1)
+        final_map_points_df['tooltip_html'] = TooltipFormatter.node_tooltips(final_map_points_df)
 
         print(f"Editor: Divisão concluída.")
         
         return GraphState(
             data_streets=final_data_streets, data_points=final_data_points,
             map_streets=final_map_streets, map_points=final_map_points_df,
-            neighborhoods=state.neighborhoods, crs=state.crs
+            neighborhoods=state.neighborhoods, crs=state.crs,
+            street_tooltips_current=state.street_tooltips_current,      # Ruas novas já formatadas
+            next_street_id=len(final_data_streets) + 1,         # IDs re-indexados (1..N)
+            next_edge_index=self._advance_index_counter(
+                state.next_edge_index, [street_data_row.get('edge_index')],
+                [idx for idx in (edge_idx_A_C, edge_idx_C_B) if idx is not None]
+            ),
+            next_arc_index=self._advance_index_counter(
+                state.next_arc_index, [street_data_row.get('arc_index')],
+                [idx for idx in (arc_idx_A_C, arc_idx_C_B) if idx is not None]
+            )
         )
     
     def remove_node_and_merge_streets(self, state: GraphState, node_id_C: int) -> GraphState:
@@ -527,10 +673,11 @@ class GraphEditor:
         print(f"Editor: Removendo nó {node_id_C} e mesclando ruas...")
         
         # Encontra as ruas conectadas a C
-        connected_streets = state.data_streets[
+        connected_mask = (
             (state.data_streets['from_node'] == node_id_C) | 
             (state.data_streets['to_node'] == node_id_C)
-        ]
+        ).to_numpy()
+        connected_streets = state.data_streets[connected_mask]
 
         if len(connected_streets) != 2:
             print(f"  ERRO: Nó {node_id_C} não conecta exatamente 2 ruas (encontradas: {len(connected_streets)}). Abortando.")
@@ -555,40 +702,45 @@ class GraphEditor:
         node_id_A = street_AC_row['from_node']
         node_id_B = street_CB_row['to_node']
 
+        # Máscaras das ruas A-C e C-B (reaproveitadas na remoção)
+        ids_to_remove = [id_AC, id_CB]
+        map_mask = self._ids_mask(state.map_streets['id'], ids_to_remove)
+        points_mask = self._ids_mask(state.data_points['from_line_id'], ids_to_remove)
+
         # Recupera linhas do mapa correspondentes
-        map_AC_row = state.map_streets[state.map_streets['id'] == id_AC].iloc[0]
-        map_CB_row = state.map_streets[state.map_streets['id'] == id_CB].iloc[0]
+        map_rows = state.map_streets[map_mask]
+        map_AC_row = map_rows[map_rows['id'] == id_AC].iloc[0]
+        map_CB_row = map_rows[map_rows['id'] == id_CB].iloc[0]
 
         print(f"  Mesclando: Rua {id_AC} (A->C) + Rua {id_CB} (C->B)")
         
         # Geometria Visual Combinada
         # [c1, c2, ..., C] + [C, c3, c4...] -> Removemos o C duplicado
-        coords_AC = list(map_AC_row.geometry.coords)
-        coords_CB = list(map_CB_row.geometry.coords)
+        coords_AC = shapely.get_coordinates(map_AC_row.geometry)
+        coords_CB = shapely.get_coordinates(map_CB_row.geometry)
         
         # Verifica snap
-        if coords_AC[-1] != coords_CB[0]:
+        if not np.array_equal(coords_AC[-1], coords_CB[0]):
             print("  Aviso: Coordenada de junção C difere")
         
-        merged_coords = coords_AC[:-1] + coords_CB[1:]      # Remove o último de AC e junta com CB
-        geom_AB_map = LineString(merged_coords)
+        merged_coords = np.vstack([coords_AC[:-1], coords_CB[1:]])      # Remove o último de AC e junta com CB
 
         # Geometria Lógica (Dados)
         # [Coord_A, Coord_B]
-        pt_A_data = state.data_points[
-            (state.data_points['from_line_id'] == id_AC) & 
-            (state.data_points['node_index'] == node_id_A)
+        connected_points = state.data_points[points_mask]
+        pt_A_data = connected_points[
+            (connected_points['from_line_id'] == id_AC) & 
+            (connected_points['node_index'] == node_id_A)
         ].iloc[0]
         
-        pt_B_data = state.data_points[
-            (state.data_points['from_line_id'] == id_CB) & 
-            (state.data_points['node_index'] == node_id_B)
+        pt_B_data = connected_points[
+            (connected_points['from_line_id'] == id_CB) & 
+            (connected_points['node_index'] == node_id_B)
         ].iloc[0]
         
-        # Desidratação (Tuplas)
-        coord_A = pt_A_data.geometry.coords[0]
-        coord_B = pt_B_data.geometry.coords[0]
-        geom_AB_data = LineString([coord_A, coord_B])
+        # Geometrias visual (mapa) e lógica (dados) em uma única chamada
+        coords_A_B = shapely.get_coordinates([pt_A_data.geometry, pt_B_data.geometry])
+        geom_AB_map, geom_AB_data = self._build_linestrings([merged_coords, coords_A_B])
 
         # Métricas
         total_dist_km = street_AC_row['total_dist'] + street_CB_row['total_dist']
@@ -597,24 +749,25 @@ class GraphEditor:
         total_custo_servico = int(round(total_custo_travessia * 1.5))
 
         # Requerido / Demanda
-        is_required = 'yes' if (street_AC_row.get('eh_requerido') == 'yes' or street_CB_row.get('eh_requerido') == 'yes') else 'no'
-        demanda = 1 if is_required == 'yes' else 0
+        demanda = int(street_AC_row.get('eh_requerido') == 'yes' or street_CB_row.get('eh_requerido') == 'yes')
+        is_required = 'yes' if demanda else 'no'
 
         # Novo ID e Índices
-        new_street_id = int(state.data_streets['id'].max()) + 1
+        new_street_id = self._get_next_street_id(state)
         
         # Gera Edge/Arc Index
         new_edge_index = None
         new_arc_index = None
         
         if pd.notna(street_AC_row.get('edge_index')) and street_AC_row['edge_index'] != -1:
-            new_edge_index = self._get_next_index(state.data_streets, 'edge_index')
+            new_edge_index = self._get_next_edge_index(state)
         else:
-            new_arc_index = self._get_next_index(state.data_streets, 'arc_index')
+            new_arc_index = self._get_next_arc_index(state)
 
         # Rua Mesclada (Dados)
-        dict_AB = street_AC_row.to_dict()       # Herda nome, bairro, etc de AC
-        dict_AB.update({
+        street_AC_dict = street_AC_row.to_dict()
+        dict_AB = {
+            **street_AC_dict,                   # Herda nome, bairro, etc de AC
             'id': new_street_id,
             'geometry': geom_AB_data,
             'total_dist': total_dist_km,
@@ -626,74 +779,64 @@ class GraphEditor:
             'arc_index': new_arc_index,
             'eh_requerido': is_required,
             'demanda': demanda
-        })
+        }
         
-        # Mapa
-        dict_map_AB = dict_AB.copy()
-        dict_map_AB.update(street_AC_row.to_dict())     # Herda propriedades visuais de AC
-        dict_map_AB.update(dict_AB)                     # Sobrescreve métricas
-        dict_map_AB['geometry'] = geom_AB_map
-        dict_map_AB['tooltip_html'] = self._preformat_street_tooltip(dict_map_AB)
+        # Mapa: dict_AB já herda as propriedades visuais de AC e sobrescreve as métricas
+        dict_map_AB = {**dict_AB, 'geometry': geom_AB_map}
+        dict_map_AB['tooltip_html'] = TooltipFormatter.street_tooltip(dict_map_AB)
         
         # Recalcula métricas baseadas na nova geometria visual
-        dist_AB_m = self._calculate_line_length(merged_coords) # Distância real visual
-        angles_AB = self._calculate_segment_angles(merged_coords)
-        mean_angle_AB = round(GeoCalculator.mean_angle_deg(angles_AB), GeoCalculator.PRECISION_DIGITS)
-        inv_angle_AB = round(GeoCalculator.azimuth_inverse(mean_angle_AB), GeoCalculator.PRECISION_DIGITS)
+        dist_AB_m, angles_AB = self._calculate_line_metrics(merged_coords)     # Distância real visual
+        mean_angle_AB, inv_angle_AB = GeoCalculator.mean_and_inverse_azimuth(angles_AB)
 
         # Ponto A (Inicio)
-        dict_pt_A = pt_A_data.to_dict()
-        dict_pt_A.update({
+        dict_pt_A = {
+            **pt_A_data.to_dict(),
             'from_line_id': new_street_id,
             'angle': mean_angle_AB,
             'angle_inv': inv_angle_AB,
             'distance': 0.0
-        })
+        }
 
         # Ponto B (Fim)
-        dict_pt_B = pt_B_data.to_dict()
-        dict_pt_B.update({
+        dict_pt_B = {
+            **pt_B_data.to_dict(),
             'from_line_id': new_street_id,
             'distance': round(dist_AB_m / 1000.0, GeoCalculator.PRECISION_DIGITS),
             'angle': 0.0,
             'angle_inv': 0.0
-        })
+        }
 
         # Atualiza DataFrames
-        ids_to_remove = [id_AC, id_CB]
-        final_data_streets = state.data_streets[~state.data_streets['id'].isin(ids_to_remove)].copy()
-        final_map_streets = state.map_streets[~state.map_streets['id'].isin(ids_to_remove)].copy()
-        final_data_points = state.data_points[~state.data_points['from_line_id'].isin(ids_to_remove)].copy()
-
-        new_streets_df = pd.DataFrame([dict_AB])
-        new_map_df = pd.DataFrame([dict_map_AB])
-        new_points_df = pd.DataFrame([dict_pt_A, dict_pt_B])
-
-        new_streets_df = self._align_dataframe_structure(new_streets_df, final_data_streets)
-        new_map_df = self._align_dataframe_structure(new_map_df, final_map_streets)
-        new_points_df = self._align_dataframe_structure(new_points_df, final_data_points)
-
-        final_data_streets = pd.concat([final_data_streets, new_streets_df], ignore_index=True)
-        final_map_streets = pd.concat([final_map_streets, new_map_df], ignore_index=True)
-        final_data_points = pd.concat([final_data_points, new_points_df], ignore_index=True)
+        final_data_streets = self._replace_rows(state.data_streets, connected_mask, [dict_AB])
+        final_map_streets = self._replace_rows(state.map_streets, map_mask, [dict_map_AB])
+        final_data_points = self._replace_rows(state.data_points, points_mask, [dict_pt_A, dict_pt_B])
 
         final_data_streets, final_data_points, final_map_streets = self._reindex_dfs(final_data_streets, final_data_points, final_map_streets)
 
         # Mapa de Pontos
-        old_map_points_state = state.map_points[['node_index', 'eh_requerido', 'depot', 'custo_servico', 'demanda']].set_index('node_index')
+        old_map_points_state = state.map_points[['node_index', 'eh_requerido', 'depot', 'custo_servico', 'demanda']]
         final_map_points_gdf = GeoCalculator.create_map_points(final_data_points)
         final_map_points_gdf = FieldsManager.ensure_fields_exist(final_map_points_gdf, FieldConfigType.EXTENDED)
-        final_map_points_gdf = final_map_points_gdf.set_index('node_index')
-        final_map_points_gdf.update(old_map_points_state)
-        final_map_points_gdf = final_map_points_gdf.reset_index()
+        final_map_points_gdf = self._restore_node_attributes(final_map_points_gdf, old_map_points_state)
         final_map_points_gdf = final_map_points_gdf[final_map_points_gdf['node_index'] != node_id_C]
         
-        final_map_points_gdf['tooltip_html'] = final_map_points_gdf.apply(lambda row: self._preformat_node_tooltip(row.to_dict()), axis=1)
+        final_map_points_gdf['tooltip_html'] = TooltipFormatter.node_tooltips(final_map_points_gdf)
 
         print("Editor: Remoção e Mesclagem concluída.")
         
         return GraphState(
             data_streets=final_data_streets, data_points=final_data_points,
             map_streets=final_map_streets, map_points=final_map_points_gdf,
-            neighborhoods=state.neighborhoods, crs=state.crs
+            neighborhoods=state.neighborhoods, crs=state.crs,
+            street_tooltips_current=state.street_tooltips_current,      # Ruas novas já formatadas
+            next_street_id=len(final_data_streets) + 1,         # IDs re-indexados (1..N)
+            next_edge_index=self._advance_index_counter(
+                state.next_edge_index, connected_streets['edge_index'].tolist(),
+                [new_edge_index] if new_edge_index is not None else []
+            ),
+            next_arc_index=self._advance_index_counter(
+                state.next_arc_index, connected_streets['arc_index'].tolist(),
+                [new_arc_index] if new_arc_index is not None else []
+            )
         )
\ No newline at end of file
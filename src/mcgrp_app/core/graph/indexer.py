@@ -1,5 +1,6 @@
 # src\mcgrp_app\core\graph\indexer.py
 
+import re
 import numpy as np
 import pandas as pd
 
@@ -11,6 +12,8 @@ class GraphIndexer:
     e pelo cálculo de custos.
     """
 
+    SPEED_PATTERN = re.compile(r'(\d+)')      # Primeiro número de 'maxspeed' ('30 km/h' -> 30)
+
     def __init__(self, valid_neighborhoods: set = None):
         self.valid_neighborhoods = valid_neighborhoods
 
@@ -79,22 +82,25 @@ class GraphIndexer:
 
         print(f"  Indexer: Filtrando DataFrames por {len(self.valid_neighborhoods)} bairros válidos...")
         
+        # Bairros válidos convertidos uma única vez e reutilizados nos três filtros
+        valid_bairros = pd.Index(list(self.valid_neighborhoods))
+
         # Filtra ruas e pontos
         state.data_streets = state.data_streets[
-            state.data_streets['id_bairro'].isin(self.valid_neighborhoods)
+            state.data_streets['id_bairro'].isin(valid_bairros)
         ].copy()
         state.map_streets = state.map_streets[
-            state.map_streets['id_bairro'].isin(self.valid_neighborhoods)
-        ].copy()
-        state.data_points = state.data_points[
-            state.data_points['id_bairro'].isin(self.valid_neighborhoods)
+            state.map_streets['id_bairro'].isin(valid_bairros)
         ].copy()
         
-        # Remove pontos que agora são órfãos
-        valid_line_ids = set(state.data_streets['id'])
-        state.data_points = state.data_points[
+        # Filtra pontos pelo bairro e remove os que agora são órfãos numa única máscara
+        # (IDs únicos em array, sem montar um set Python), copiando uma só vez
+        valid_line_ids = state.data_streets['id'].unique()
+        valid_points_mask = (
+            state.data_points['id_bairro'].isin(valid_bairros) &
             state.data_points['from_line_id'].isin(valid_line_ids)
-        ].copy()
+        )
+        state.data_points = state.data_points[valid_points_mask].copy()
 
         return state
 
@@ -102,30 +108,43 @@ class GraphIndexer:
         """Atribui 'node_index' (1-N) aos pontos."""
         print("  Indexer: Atribuindo 'node_index'...")
         
-        # Cria 'coord_tuple' para agrupamento
-        state.data_points['coord_tuple'] = state.data_points['geometry'].apply(
-            lambda p: tuple(np.round(p.coords[0], GeoCalculator.PRECISION_DIGITS))
-        )
-        
-        # Obtém todas as coordenadas únicas na ordem em que aparecem
-        unique_coords = state.data_points['coord_tuple'].unique()
-        
-        # Cria o mapa (coord -> node_index 1-N)
-        coords_to_node_map = {
-            coord: idx + 1 for idx, coord in enumerate(unique_coords)
-        }
+        # Coordenadas arredondadas como arrays (lon, lat), sem acessar cada objeto Shapely em Python
+        coords = GeoCalculator.rounded_coords(state.data_points['geometry'].to_numpy())
         
-        # Mapeia o 'node_index' para o DataFrame de dados
-        state.data_points['node_index'] = state.data_points['coord_tuple'].map(coords_to_node_map)
-
-        state.data_points = state.data_points.drop(columns='coord_tuple')
+        # Numera as coordenadas únicas (1-N) na ordem em que aparecem: fatoriza cada eixo,
+        # combina os dois códigos em uma chave inteira única por par e fatoriza a chave
+        # (deslocamento +1 mantém a chave injetiva mesmo com código -1 de NaN)
+        lon_codes, _ = pd.factorize(coords[:, 0])
+        lat_codes, lat_uniques = pd.factorize(coords[:, 1])
+        pair_keys = (lon_codes.astype(np.int64) + 1) * (len(lat_uniques) + 1) + (lat_codes + 1)
+        node_codes, _ = pd.factorize(pair_keys)
+        state.data_points['node_index'] = node_codes + 1
         
         # Reconstrói o DataFrame de mapa (visual)
         print("  Indexer: Reconstruindo DataFrame de pontos de mapa (para 'node_index')...")
-        state.map_points = GeoCalculator.create_map_points(state.data_points)
+        state.map_points = GeoCalculator.create_map_points(state.data_points, coords)
 
         return state
 
+    @staticmethod
+    def _mirror_columns(source: pd.DataFrame, target: pd.DataFrame, key_cols: list, value_cols: list) -> bool:
+        """
+        Copia value_cols de source para target quando ambos têm as mesmas linhas, na mesma
+        ordem e com os mesmos valores em key_cols (o cálculo daria o mesmo resultado).
+        Retorna False, sem copiar nada, caso contrário.
+        """
+        if len(source) != len(target):
+            return False
+        for col in key_cols:
+            if col not in source.columns or col not in target.columns:
+                return False
+            if not source[col].reset_index(drop=True).equals(target[col].reset_index(drop=True)):
+                return False
+
+        for col in value_cols:
+            target[col] = source[col].set_axis(target.index)
+        return True
+
     def _assign_edge_and_arc_indices(self, state: GraphState) -> GraphState:
         """Atribui 'edge_index' (bidirecional) e 'arc_index' (unidirecional)."""
         print("  Indexer: Atribuindo 'edge_index' e 'arc_index'...")
@@ -133,27 +152,21 @@ class GraphIndexer:
         for df in [state.data_streets, state.map_streets]:
             if df.empty: continue
 
+            # Ruas de mapa espelhando as de dados: reaproveita os índices já calculados
+            if df is state.map_streets and self._mirror_columns(
+                state.data_streets, df, ['id', 'oneway'], ['edge_index', 'arc_index']
+            ):
+                continue
+
             # Normaliza 'oneway' (None, NaN, 'não' -> 'no')
             oneway = df['oneway'].fillna('no').astype(str).str.lower()
             is_arc = (oneway == 'yes') | (oneway == '1') | (oneway == 'true')
             
-            # Cria máscaras booleanas para atribuição
-            n_edges = (~is_arc).sum()
-            n_arcs = is_arc.sum()
-            
-            # Inicializa com NA
-            df['edge_index'] = pd.NA
-            df['arc_index'] = pd.NA
-            
-            if n_edges > 0:
-                df.loc[~is_arc, 'edge_index'] = range(1, n_edges + 1)
-            
-            if n_arcs > 0:
-                df.loc[is_arc, 'arc_index'] = range(1, n_arcs + 1)
-            
-            # Converte para Int64
-            df['edge_index'] = df['edge_index'].astype('Int64')
-            df['arc_index'] = df['arc_index'].astype('Int64')
+            # Numeração sequencial (1-N) de cada tipo via cumsum; as posições do
+            # outro tipo ficam mascaradas (NA) no array Int64
+            arc_mask = is_arc.to_numpy(dtype=bool)
+            df['edge_index'] = pd.arrays.IntegerArray(np.cumsum(~arc_mask, dtype=np.int64), arc_mask.copy())
+            df['arc_index'] = pd.arrays.IntegerArray(np.cumsum(arc_mask, dtype=np.int64), ~arc_mask)
         
         return state
 
@@ -178,6 +191,12 @@ class GraphIndexer:
         
         for df in [state.data_streets, state.map_streets]:
             if df.empty: continue
+
+            # Mesmos IDs, na mesma ordem: o mapeamento seria idêntico
+            if df is state.map_streets and self._mirror_columns(
+                state.data_streets, df, ['id'], ['from_node', 'to_node']
+            ):
+                continue
             
             # Mapeia usando o ID da rua
             df['from_node'] = df['id'].map(start_map).astype('Int64')
@@ -192,9 +211,22 @@ class GraphIndexer:
         for df in [state.data_streets, state.map_streets]:
             if df.empty: continue
 
+            # Mesma velocidade e distância por rua: reaproveita os custos de data_streets
+            if df is state.map_streets and self._mirror_columns(
+                state.data_streets, df, ['id', 'maxspeed', 'total_dist'], ['custo_travessia', 'custo_servico']
+            ):
+                continue
+
             # Extrai números da string de velocidade '30 km/h' -> 30.0
+            # A regex roda só nos valores distintos (poucos), depois é expandida por código
+            speed_codes, speed_values = pd.factorize(df['maxspeed'])
+            unique_speeds = pd.Series(speed_values, dtype=object).astype(str).str.extract(self.SPEED_PATTERN)[0].astype(float)
+            speeds = pd.Series(
+                np.append(unique_speeds.to_numpy(), np.nan)[speed_codes],     # Código -1 (nulo) -> NaN
+                index=df.index
+            )
+
             # Preenche NaNs com DEFAULT
-            speeds = df['maxspeed'].astype(str).str.extract(r'(\d+)')[0].astype(float)
             speeds = speeds.fillna(GeoCalculator.DEFAULT_MAX_SPEED)
             speeds = speeds.replace(0, GeoCalculator.DEFAULT_MAX_SPEED)
             
@@ -205,10 +237,11 @@ class GraphIndexer:
             costs_seconds = (dists / speeds * 3600).fillna(0)
             
             # Arredonda para cima e converte para Int64
-            df['custo_travessia'] = np.ceil(costs_seconds).astype('Int64')
+            custo_travessia = np.ceil(costs_seconds).astype('Int64')
+            df['custo_travessia'] = custo_travessia
             
-            # Custo Serviço = 1.5 * Travessia
-            df['custo_servico'] = np.ceil(df['custo_travessia'] * 1.5).astype('Int64')
+            # Custo Serviço = ceil(1.5 * Travessia), em aritmética inteira: ceil(3t / 2) = (3t + 1) // 2
+            df['custo_servico'] = (3 * custo_travessia + 1) // 2
 
         return state
 
@@ -222,9 +255,13 @@ class GraphIndexer:
             state.data_streets['to_node'].isna() |
             (state.data_streets['edge_index'].isna() & state.data_streets['arc_index'].isna())
         )
-        invalid_street_ids = set(state.data_streets[invalid_streets_mask]['id'])
+        # IDs únicos em array (consumido pelos isin em C, sem montar um set Python)
+        invalid_street_ids = state.data_streets.loc[invalid_streets_mask, 'id'].unique()
         
-        if invalid_street_ids:
+        # Pontos a remover (órfãos e sem 'node_index'), acumulados numa única máscara
+        drop_points_mask = pd.Series(False, index=state.data_points.index)
+
+        if len(invalid_street_ids) > 0:
             print(f"  Removendo {len(invalid_street_ids)} ruas inválidas.")
             # Remove de ambos os DataFrames de ruas
             state.data_streets = state.data_streets[~invalid_streets_mask].copy()
@@ -232,19 +269,22 @@ class GraphIndexer:
                 ~state.map_streets['id'].isin(invalid_street_ids)
             ].copy()
             
-            # Remove pontos órfãos
-            state.data_points = state.data_points[
-                ~state.data_points['from_line_id'].isin(invalid_street_ids)
-            ].copy()
-            state.map_points = state.map_points[
-                ~state.map_points['from_line_id'].apply(lambda x: bool(set(x) & invalid_street_ids))
-            ].copy()
+            # Marca pontos órfãos
+            drop_points_mask = state.data_points['from_line_id'].isin(invalid_street_ids)
+            # Explode as listas de 'from_line_id' e marca o ponto se alguma rua for inválida
+            line_ids = state.map_points['from_line_id'].reset_index(drop=True).explode()
+            touches_invalid = line_ids.isin(invalid_street_ids).groupby(level=0).any().to_numpy()
+            state.map_points = state.map_points[~touches_invalid].copy()
 
-        # Encontra pontos inválidos (sem 'node_index')
-        invalid_points_mask = state.data_points['node_index'].isna()
+        # Encontra pontos inválidos (sem 'node_index') entre os que não são órfãos
+        invalid_points_mask = state.data_points['node_index'].isna() & ~drop_points_mask
         if invalid_points_mask.any():
             print(f"  Removendo {invalid_points_mask.sum()} pontos inválidos.")
-            state.data_points = state.data_points[~invalid_points_mask].copy()
             # (map_points_gdf é reconstruído)
 
+        # Filtra e copia data_points uma única vez
+        drop_points_mask = drop_points_mask | invalid_points_mask
+        if drop_points_mask.any():
+            state.data_points = state.data_points[~drop_points_mask].copy()
+
         return state
\ No newline at end of file
@@ -2,6 +2,7 @@
 
 import heapq
 import pandas as pd
+import shapely
 from collections import defaultdict
 from typing import Dict, Set, List, Tuple
 
@@ -21,6 +22,9 @@ class ShortestPathAnalyzer:
         self.depot_node = None
         self.depot_id_bairro = None
         self.graph = defaultdict(list)
+        self._street_bairros = {}                       # line_id -> id_bairro (ruas do grafo)
+        self._depot_tree = None                         # (depósito, distâncias, predecessores), sob demanda
+        self._dijkstra_cache = {}                       # (origem, destino) -> (distância, line_ids)
         self.neighborhood_connections = {}              # Bairro -> Depósito
         self.neighborhood_connections_return = {}       # Depósito -> Bairro
 
@@ -61,26 +65,49 @@ class ShortestPathAnalyzer:
 
     def _build_graph(self) -> None:
         """Constrói grafo de adjacências para Dijkstra."""
-        # Limpa grafo anterior
+        # Limpa grafo anterior (e os caminhos calculados sobre ele)
         self.graph = defaultdict(list)
+        self._street_bairros = {}
+        self._invalidate_paths()
         
         if self.state.data_streets is None or self.state.data_streets.empty:
             return
 
-        for row in self.state.data_streets.itertuples():
-            u = int(getattr(row, 'from_node'))
-            v = int(getattr(row, 'to_node'))
-            weight = getattr(row, 'custo_travessia', 0)
-            line_id = getattr(row, 'id')
-            
+        streets = self.state.data_streets
+
+        # Colunas extraídas uma única vez como listas (sem uma namedtuple por rua)
+        from_nodes = [int(u) for u in streets['from_node'].tolist()]
+        to_nodes = [int(v) for v in streets['to_node'].tolist()]
+        weights = streets['custo_travessia'].tolist() if 'custo_travessia' in streets.columns else [0] * len(streets)
+        line_ids = streets['id'].tolist()
+
+        # Aresta (bidirecional): 'edge_index' preenchido e diferente de -1
+        if 'edge_index' in streets.columns:
+            edge_idx = streets['edge_index']
+            is_edge = (edge_idx.notna() & (edge_idx != -1)).tolist()
+        else:
+            is_edge = [False] * len(streets)
+
+        # Bairro de cada rua, consultado ao registrar os caminhos (sem varrer o DataFrame)
+        has_bairro = streets['id_bairro'].notna()
+        self._street_bairros = dict(zip(
+            streets.loc[has_bairro, 'id'].tolist(),
+            streets.loc[has_bairro, 'id_bairro'].astype(int).tolist()
+        ))
+
+        for u, v, weight, line_id, bidirectional in zip(from_nodes, to_nodes, weights, line_ids, is_edge):
             # Aresta direcionada u -> v
             self.graph[u].append((v, weight, line_id))
             
             # Se for aresta (bidirecional), adiciona v -> u
-            edge_idx = getattr(row, 'edge_index', None)
-            if pd.notna(edge_idx) and int(edge_idx) != -1:
+            if bidirectional:
                 self.graph[v].append((u, weight, line_id))
 
+    def _invalidate_paths(self) -> None:
+        """Descarta a árvore do depósito e os caminhos memorizados (grafo alterado)."""
+        self._depot_tree = None
+        self._dijkstra_cache = {}
+
     def _find_depot(self) -> None:
         """Localiza o nó e o bairro do depósito."""
         if self.state.data_points is None:
@@ -137,8 +164,8 @@ class ShortestPathAnalyzer:
 
         # Para cada saída, calcula Dijkstra até/do Depósito
         for exit_node in exit_nodes:
-            # Ida: Depósito -> Saída
-            dist1, path1 = self._dijkstra_with_path(self.depot_node, exit_node)
+            # Ida: Depósito -> Saída (consulta à árvore do depósito)
+            dist1, path1 = self._depot_path_to(exit_node)
             
             # Volta: Saída -> Depósito
             dist2, path2 = self._dijkstra_with_path(exit_node, self.depot_node)
@@ -164,47 +191,106 @@ class ShortestPathAnalyzer:
         # Filtra ruas que pertencem a este bairro
         streets_in_neigh = self.state.map_streets[self.state.map_streets['id_bairro'] == neighborhood_id]
         
-        exit_nodes = set()
+        # Ruas que cruzam (ou tocam) a fronteira, testadas em bloco
+        crosses = shapely.intersects(streets_in_neigh['geometry'].to_numpy(), boundary_geom)
+        crossing_streets = streets_in_neigh[crosses]
         
-        # Itera sobre as ruas do bairro
-        for row in streets_in_neigh.itertuples():
-            # Se a rua cruza a fronteira (ou toca)
-            if row.geometry.intersects(boundary_geom):
-                exit_nodes.add(int(row.from_node))
-                exit_nodes.add(int(row.to_node))
+        # Conjunto de saídas: um set não preserva a ordem de inserção, mas os mesmos
+        # inteiros são inseridos na mesma sequência (início, fim de cada rua, na ordem da
+        # tabela) que no laço por linha original, logo a iteração sai na mesma ordem
+        # (a que decide empates de distância entre saídas)
+        exit_nodes = set()
+        for from_node, to_node in zip(crossing_streets['from_node'].tolist(), crossing_streets['to_node'].tolist()):
+            exit_nodes.add(int(from_node))
+            exit_nodes.add(int(to_node))
             
         return list(exit_nodes)
 
-    def _dijkstra_with_path(self, start_node: int, end_node: int) -> Tuple[float, List[int]]:
-        """Dijkstra padrão. Retorna (distância, lista_de_line_ids)."""
+    def _dijkstra_with_path(self, start_node: int, end_node: int) -> Tuple[float, Tuple[int, ...]]:
+        """
+        Dijkstra padrão. Retorna (distância, tupla_de_line_ids).
+        Resultados memorizados por (origem, destino): bairros vizinhos compartilham saídas.
+        """
+        key = (start_node, end_node)
+        if key not in self._dijkstra_cache:
+            self._dijkstra_cache[key] = self._dijkstra_search(start_node, end_node)
+        return self._dijkstra_cache[key]
+
+    def _dijkstra_search(self, start_node: int, end_node: int) -> Tuple[float, Tuple[int, ...]]:
+        """Busca de _dijkstra_with_path, sem memorização."""
         if start_node == end_node:
-            return 0.0, []
+            return 0.0, ()
         
+        inf = float('inf')
         distances = {start_node: 0}
         previous = {}                   # {node: (prev_node, line_id)}
         heap = [(0, start_node)]
-        visited = set()
 
         while heap:
             current_dist, current_node = heapq.heappop(heap)
 
-            if current_node in visited: continue
-            visited.add(current_node)
-
+            # A primeira retirada de um nó tem a menor distância (pesos não negativos)
             if current_node == end_node:
-                return current_dist, self._reconstruct_path_lines(previous, start_node, end_node)
+                return current_dist, tuple(self._reconstruct_path_lines(previous, start_node, end_node))
 
-            if current_dist > distances.get(current_node, float('inf')):
+            # Remoção preguiçosa: entradas obsoletas (distância maior) são descartadas,
+            # dispensando o conjunto de visitados
+            if current_dist > distances.get(current_node, inf):
                 continue
 
             for neighbor, weight, line_id in self.graph[current_node]:
                 new_dist = current_dist + weight
-                if new_dist < distances.get(neighbor, float('inf')):
+                if new_dist < distances.get(neighbor, inf):
                     distances[neighbor] = new_dist
                     previous[neighbor] = (current_node, line_id)
                     heapq.heappush(heap, (new_dist, neighbor))
 
-        return float('inf'), []
+        return float('inf'), ()
+
+    def _dijkstra_all_targets(self, start_node: int) -> Tuple[Dict[int, float], Dict]:
+        """
+        Dijkstra sem destino fixo. Retorna (distâncias, predecessores) de todos os nós
+        alcançáveis; os caminhos coincidem com os de _dijkstra_with_path a partir do mesmo nó.
+        """
+        inf = float('inf')
+        distances = {start_node: 0}
+        previous = {}                   # {node: (prev_node, line_id)}
+        heap = [(0, start_node)]
+
+        while heap:
+            current_dist, current_node = heapq.heappop(heap)
+
+            # Remoção preguiçosa, como em _dijkstra_search
+            if current_dist > distances.get(current_node, inf):
+                continue
+
+            for neighbor, weight, line_id in self.graph[current_node]:
+                new_dist = current_dist + weight
+                if new_dist < distances.get(neighbor, inf):
+                    distances[neighbor] = new_dist
+                    previous[neighbor] = (current_node, line_id)
+                    heapq.heappush(heap, (new_dist, neighbor))
+
+        return distances, previous
+
+    def _get_depot_tree(self) -> Tuple[int, Dict[int, float], Dict]:
+        """
+        Árvore de caminhos mínimos a partir do depósito, calculada uma única vez
+        (um Dijkstra) e reaproveitada por todas as saídas de todos os bairros.
+        """
+        if self._depot_tree is None or self._depot_tree[0] != self.depot_node:
+            distances, previous = self._dijkstra_all_targets(self.depot_node)
+            self._depot_tree = (self.depot_node, distances, previous)
+        return self._depot_tree
+
+    def _depot_path_to(self, end_node: int) -> Tuple[float, Tuple[int, ...]]:
+        """Caminho Depósito -> end_node lido da árvore do depósito. Retorna (distância, tupla_de_line_ids)."""
+        depot_node, distances, previous = self._get_depot_tree()
+        if end_node == depot_node:
+            return 0.0, ()
+        if end_node not in distances:
+            return float('inf'), ()
+        return distances[end_node], tuple(self._reconstruct_path_lines(previous, depot_node, end_node))
 
     def _reconstruct_path_lines(self, previous: Dict, start: int, end: int) -> List[int]:
         path_lines = []
@@ -215,11 +301,11 @@ class ShortestPathAnalyzer:
             curr = prev
         return list(reversed(path_lines))
 
-    def _register_path_neighborhoods(self, line_ids: List[int], neighbors_set: Set[int]):
+    def _register_path_neighborhoods(self, line_ids: Tuple[int, ...], neighbors_set: Set[int]):
         """Adiciona os bairros das ruas do caminho ao conjunto de vizinhos."""
-        rows = self.state.data_streets[self.state.data_streets['id'].isin(line_ids)]
-        bairros = rows['id_bairro'].dropna().unique().astype(int)
-        neighbors_set.update(bairros)
+        neighbors_set.update(
+            self._street_bairros[line_id] for line_id in line_ids if line_id in self._street_bairros
+        )
 
     def prune_dead_ends(self):
         """
@@ -233,82 +319,112 @@ class ShortestPathAnalyzer:
         """
         Remove iterativamente nós extremos de ruas sem saída, 
         desde que não sejam requeridos ou depósitos.
+        Graus e incidências são atualizados a cada rodada; os DataFrames são filtrados uma única vez ao final.
         """
-        changed = True
+        streets = self.state.data_streets
+        points = self.state.data_points
+
+        # Extremidades, IDs e flags das ruas como listas (posição na tabela)
+        from_nodes = streets['from_node'].tolist()
+        to_nodes = streets['to_node'].tolist()
+        from_valid = streets['from_node'].notna().tolist()
+        to_valid = streets['to_node'].notna().tolist()
+        street_ids = streets['id'].tolist()
+        street_required = (streets['eh_requerido'] == 'yes').tolist()
+        active = [True] * len(streets)
+
+        # Grau de cada nó (nós nulos não contam) e ruas incidentes
+        degree = defaultdict(int)
+        streets_by_node = defaultdict(list)
+        positions_by_id = defaultdict(list)
+        for pos, (u, v, u_valid, v_valid, line_id) in enumerate(zip(from_nodes, to_nodes, from_valid, to_valid, street_ids)):
+            positions_by_id[line_id].append(pos)
+            if u_valid:
+                degree[u] += 1
+                streets_by_node[u].append(pos)
+            if v_valid:
+                degree[v] += 1
+                streets_by_node[v].append(pos)
+
+        # Pontos de cada nó, na ordem da tabela: vale o primeiro ainda ativo (ver drop_duplicates)
+        points_by_node = points.groupby('node_index', sort=False).indices
+        point_line_ids = points['from_line_id'].to_numpy()
+        point_removable = ((points['eh_requerido'] != 'yes') & (points['depot'] != 'yes')).to_numpy()
+
+        # Nós com grau 1 (Extremos/Leafs)
+        leaf_nodes = {node for node, count in degree.items() if count == 1}
+        removed_ids = set()
+
+        def is_removable(node) -> bool:
+            """Leaf + Não Requerido + Não Depósito, pelo primeiro ponto restante do nó."""
+            for i in points_by_node.get(node, ()):
+                if point_line_ids[i] not in removed_ids:
+                    return bool(point_removable[i])
+            return False
+
         iteration = 0
 
-        while changed:
-            changed = False
+        while leaf_nodes:
             iteration += 1
-            
-            # Calcular grau de todos os nós (baseado em ruas ativas)
-            all_nodes = pd.concat([
-                self.state.data_streets['from_node'], 
-                self.state.data_streets['to_node']
-            ])
-            node_counts = all_nodes.value_counts()
-            
-            # Nós com grau 1 (Extremos/Leafs)
-            leaf_nodes = node_counts[node_counts == 1].index
-            
-            if leaf_nodes.empty:
-                break
 
-            # Identificar nós removíveis (Leaf + Não Requerido + Não Depósito)
-            unique_points = self.state.data_points.drop_duplicates('node_index').set_index('node_index')
-            
-            # Intersecção entre folhas e pontos existentes
-            candidate_leaves = unique_points.index.intersection(leaf_nodes)
-            candidates = unique_points.loc[candidate_leaves]
-            
-            removable_nodes = candidates[
-                (candidates['eh_requerido'] != 'yes') & 
-                (candidates['depot'] != 'yes')
-            ].index
-
-            if removable_nodes.empty:
+            # Identificar nós removíveis
+            removable_nodes = [node for node in leaf_nodes if is_removable(node)]
+            if not removable_nodes:
                 break
 
-            # Identificar Ruas removíveis
-            streets = self.state.data_streets
-            
-            # A rua deve tocar um nó removível
-            touch_removable = streets['from_node'].isin(removable_nodes) | \
-                              streets['to_node'].isin(removable_nodes)
-            
-            # A rua NÃO pode ser requerida
-            not_required = streets['eh_requerido'] != 'yes'
-            
-            streets_to_remove = streets[touch_removable & not_required]
-            
-            if streets_to_remove.empty:
+            # Ruas ativas que tocam um nó removível e NÃO são requeridas
+            positions_to_remove = {
+                pos for node in removable_nodes for pos in streets_by_node[node]
+                if active[pos] and not street_required[pos]
+            }
+            if not positions_to_remove:
                 break
-                
-            # Executar Remoção
-            ids_to_remove = streets_to_remove['id'].tolist()
-            
-            count_removed = len(ids_to_remove)
-            if count_removed > 0:
-                # Remove Ruas (Dados e Mapa)
-                self.state.data_streets = self.state.data_streets[
-                    ~self.state.data_streets['id'].isin(ids_to_remove)
-                ].copy()
-                
-                self.state.map_streets = self.state.map_streets[
-                    ~self.state.map_streets['id'].isin(ids_to_remove)
-                ].copy()
-                
-                # Remove Pontos associados às ruas removidas
-                self.state.data_points = self.state.data_points[
-                    ~self.state.data_points['from_line_id'].isin(ids_to_remove)
-                ].copy()
-                
-                # Atualiza mapa visual de pontos
-                valid_nodes = set(self.state.data_points['node_index'])
-                self.state.map_points = self.state.map_points[
-                    self.state.map_points['node_index'].isin(valid_nodes)
-                ].copy()
-                
-                print(f"   Iter {iteration}: Removidas {count_removed} ruas sem saída.")
-                
-                changed = True
\ No newline at end of file
+
+            # Executar Remoção (por ID, como no filtro final) e atualizar os graus
+            ids_to_remove = {street_ids[pos] for pos in positions_to_remove}
+            removed_ids.update(ids_to_remove)
+
+            for line_id in ids_to_remove:
+                for pos in positions_by_id[line_id]:
+                    if not active[pos]:
+                        continue
+                    active[pos] = False
+
+                    for node, valid in ((from_nodes[pos], from_valid[pos]), (to_nodes[pos], to_valid[pos])):
+                        if not valid:
+                            continue
+                        degree[node] -= 1
+                        if degree[node] == 1:
+                            leaf_nodes.add(node)
+                        else:
+                            leaf_nodes.discard(node)
+
+            print(f"   Iter {iteration}: Removidas {len(positions_to_remove)} ruas sem saída.")
+
+        if not removed_ids:
+            return
+
+        # Remove Ruas (Dados e Mapa) de uma só vez
+        ids_to_remove = list(removed_ids)
+        self.state.data_streets = self.state.data_streets[
+            ~self.state.data_streets['id'].isin(ids_to_remove)
+        ].copy()
+        
+        self.state.map_streets = self.state.map_streets[
+            ~self.state.map_streets['id'].isin(ids_to_remove)
+        ].copy()
+        
+        # Remove Pontos associados às ruas removidas
+        self.state.data_points = self.state.data_points[
+            ~self.state.data_points['from_line_id'].isin(ids_to_remove)
+        ].copy()
+        
+        # Atualiza mapa visual de pontos
+        valid_nodes = set(self.state.data_points['node_index'])
+        self.state.map_points = self.state.map_points[
+            self.state.map_points['node_index'].isin(valid_nodes)
+        ].copy()
+
+        # Grafo já construído: reconstrói sobre as ruas restantes (descarta também os caminhos)
+        if self.graph:
+            self._build_graph()
@@ -50,21 +50,16 @@ class ReducedGraphProcessor:
             for line_id, group in state.data_points.groupby('from_line_id')
         }
 
-        # Indexa as ruas por 'id'
-        self._lines_by_id = {
-            row.id: row.Index
-            for row in state.data_streets.itertuples()
-        }
+        # Indexa as ruas por 'id' (zip das colunas, sem montar uma namedtuple por linha)
+        self._lines_by_id = dict(zip(state.data_streets['id'].tolist(), state.data_streets.index))
 
         # Mapeia coord_tuple -> [lista_de_indices_DF]
         temp_points_by_coord = {}
         
-        # Constrói mapa de pontos por coordenada
-        for point_row in state.data_points.itertuples():
-            coord_tuple = tuple(np.round(point_row.geometry.coords[0], GeoCalculator.PRECISION_DIGITS))
-            if coord_tuple not in temp_points_by_coord:
-                temp_points_by_coord[coord_tuple] = []
-            temp_points_by_coord[coord_tuple].append(point_row.Index) 
+        # Constrói mapa de pontos por coordenada, com as coordenadas arredondadas extraídas em bloco
+        coords = GeoCalculator.rounded_coords(state.data_points['geometry'].to_numpy())
+        for lon, lat, point_idx in zip(coords[:, 0].tolist(), coords[:, 1].tolist(), state.data_points.index):
+            temp_points_by_coord.setdefault((lon, lat), []).append(point_idx)
         self._points_by_coord = temp_points_by_coord
 
         self.next_temp_line_id = (state.data_streets['id'].max() if not state.data_streets.empty else 0) + 1
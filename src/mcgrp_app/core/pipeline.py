@@ -8,7 +8,7 @@ from PySide6.QtCore import QObject, Signal, Slot
 
 from .processing import GeoProcessor, PointExploder, LineStringSplitter
 from .graph import ReducedGraphProcessor, GraphIndexer
-from .utils import FieldsManager, FieldConfigType, GraphState
+from .utils import FieldsManager, FieldConfigType, GraphState, TooltipFormatter
 from ..persistence import FileManager, DataBaseManager
 
 class GeoPipeline(QObject):
@@ -78,32 +78,11 @@ class GeoPipeline(QObject):
         
         # --- Ruas ---
         if state.map_streets is not None:
-            state.map_streets['total_dist_fmt'] = state.map_streets['total_dist'].apply(
-                lambda x: f"{x:.3f} km" if pd.notna(x) else "N/A"
-            )
-            
-            def format_rua_html(row):
-                oneway = (str(row.get('oneway', 'no')) or 'no').lower()
-                if oneway in ['yes', '1', 'true']:
-                    header = f"<b>Arco:</b> {row.get('arc_index', '?')} (De: {row.get('from_node', '?')}, Para: {row.get('to_node', '?')})"
-                else:
-                    header = f"<b>Aresta:</b> {row.get('edge_index', '?')}"
-                
-                rua = row.get('name', 'desconhecida')
-                bairro = row.get('bairro', 'N/A')
-                dist = row.get('total_dist_fmt', 'N/A')
-                custo_val = row.get('custo_travessia')
-                custo = f"{custo_val} s" if pd.notna(custo_val) else "N/A"
-                
-                return (
-                    f"{header}"
-                    f"<br><b>Rua:</b> {rua}"
-                    f"<br><b>Bairro:</b> {bairro}"
-                    f"<br><b>Comprimento:</b> {dist}"
-                    f"<br><b>Custo Travessia:</b> {custo}"
-                )
-            
-            state.map_streets['tooltip_html'] = state.map_streets.apply(format_rua_html, axis=1)
+            # Mesmo formatador (por coluna) usado pelo editor após as edições
+            dist_labels = TooltipFormatter.distance_labels(state.map_streets)
+            state.map_streets['total_dist_fmt'] = dist_labels
+            state.map_streets['tooltip_html'] = TooltipFormatter.street_tooltips(state.map_streets, dist_labels)
+            state.street_tooltips_current = True
 
         # --- Pontos ---
         if state.map_points is not None:
@@ -112,16 +91,8 @@ class GeoPipeline(QObject):
             if 'depot' not in state.map_points.columns:
                 state.map_points['depot'] = 'no'
             
-            def format_no_html(row):
-                node_idx = int(row['node_index']) if pd.notna(row.get('node_index')) else '?'
-                custo_serv = int(row['custo_servico']) if pd.notna(row.get('custo_servico')) else 0
-                
-                return (
-                    f"<b>Nó:</b> {node_idx}"
-                    f"<br><b>Custo de serviço:</b> {custo_serv}s"
-                )
-
-            state.map_points['tooltip_html'] = state.map_points.apply(format_no_html, axis=1)
+            # Mesmo formatador usado pelo editor
+            state.map_points['tooltip_html'] = TooltipFormatter.node_tooltips(state.map_points)
             
         return state
     
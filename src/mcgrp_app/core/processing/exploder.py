@@ -2,6 +2,7 @@
 
 import numpy as np
 import pandas as pd
+import shapely
 from shapely.geometry import Point
 
 from ..utils import FieldsManager, GeoCalculator, GraphState
@@ -97,13 +98,11 @@ class PointExploder:
         """
         print("  Rotulando vértices 'unidos'...")
         
-        # Cria uma coluna 'coord_tuple' para agrupamento preciso
-        state.data_points['coord_tuple'] = state.data_points['geometry'].apply(
-            lambda p: tuple(np.round(p.coords[0], GeoCalculator.PRECISION_DIGITS))
-        )
+        # Coordenadas arredondadas (lon, lat) extraídas em bloco para agrupamento preciso
+        coords = GeoCalculator.rounded_coords(state.data_points['geometry'].to_numpy())
         
         # Agrupa por coordenada
-        grouped = state.data_points.groupby('coord_tuple')
+        grouped = state.data_points.groupby([coords[:, 0], coords[:, 1]])
         
         # 'transform' aplica o resultado de volta ao DF original
         # 'count' conta o número total de pontos em cada grupo de coordenadas
@@ -112,8 +111,6 @@ class PointExploder:
         # Se mais de 1 linha única compartilha a coordenada, é 'unido'
         state.data_points['eh_unido'] = np.where(point_counts > 1, 'yes', 'no')
 
-        state.data_points = state.data_points.drop(columns='coord_tuple')
-
         return state
 
     def _label_by_line(self, state: GraphState) -> GraphState:
@@ -139,8 +136,12 @@ class PointExploder:
             # Ordena os pontos da rua
             sorted_points = group.sort_values(by='vertex_index')
             
-            # Converte para tuplas (lon, lat) para o GeoCalculator
-            coords = [tuple(p.coords[0]) for p in sorted_points['geometry']]
+            # Coordenadas (lon, lat) em um array (N, 2) para o GeoCalculator
+            coords = shapely.get_coordinates(sorted_points['geometry'].to_numpy())
+
+            # Distâncias (simétricas) e ângulos (atual -> próximo) de todos os segmentos de uma vez
+            dists, angles = GeoCalculator.haversine_and_azimuth_vec(coords[:-1], coords[1:])
+            dists, angles = dists.tolist(), angles.tolist()
             
             # Converte o grupo em uma lista de dicionários
             group_rows = sorted_points.to_dict('records')
@@ -153,7 +154,7 @@ class PointExploder:
                 
                 if idx > 0:
                     # Distância j -> i (atual -> anterior)
-                    dist_m = GeoCalculator.haversine_distance(coords[idx], coords[idx - 1])
+                    dist_m = dists[idx - 1]
                     total_dist_m += dist_m
                     row['distance'] = dist_m
                     row['vertex_to'] = group_rows[idx - 1]['vertex_index']
@@ -163,7 +164,7 @@ class PointExploder:
                 
                 if idx < len(group_rows) - 1:
                     # Ângulo i -> j (atual -> próximo)
-                    angle = GeoCalculator.azimuth(coords[idx], coords[idx + 1])
+                    angle = angles[idx]
                     row['angle'] = round(angle, GeoCalculator.PRECISION_DIGITS)
                     row['angle_inv'] = round(GeoCalculator.azimuth_inverse(angle), GeoCalculator.PRECISION_DIGITS)
                     row['eh_extremidade'] = 'no'
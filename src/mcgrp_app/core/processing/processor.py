@@ -4,6 +4,7 @@ import pandas as pd
 import geopandas as gpd
 import traceback
 import itertools
+import shapely
 from typing import Tuple
 from shapely.geometry import LineString
 
@@ -194,11 +195,13 @@ class GeoProcessor:
             # Remove NaNs/None
             modified_streets_df = modified_streets_df[modified_streets_df['geometry'].notna()]
             
-            # Remove geometrias vazias
-            modified_streets_df = modified_streets_df[~modified_streets_df['geometry'].apply(lambda g: g.is_empty)]
-            
-            # Valida tipo e integridade
-            valid_mask = modified_streets_df['geometry'].apply(lambda g: g.is_valid and g.geom_type == 'LineString')
+            # Remove geometrias vazias e valida tipo e integridade (operações vetorizadas do Shapely)
+            geoms = modified_streets_df['geometry'].to_numpy()
+            valid_mask = (
+                ~shapely.is_empty(geoms) &
+                shapely.is_valid(geoms) &
+                (shapely.get_type_id(geoms) == shapely.GeometryType.LINESTRING)
+            )
             modified_streets_df = modified_streets_df[valid_mask]
             
             if modified_streets_df.empty:
@@ -279,8 +282,11 @@ class GeoProcessor:
         print("  Removendo LineStrings inválidas (menos de 2 pontos).")
         
         # Filtra geometrias válidas
-        is_valid = data_df['geometry'].apply(
-            lambda geom: geom is not None and not geom.is_empty and geom.geom_type == 'LineString' and len(geom.coords) >= 2
+        # (None -> tipo -1; vazia -> 0 coordenadas)
+        geoms = data_df['geometry'].to_numpy()
+        is_valid = pd.Series(
+            (shapely.get_type_id(geoms) == shapely.GeometryType.LINESTRING) & (shapely.get_num_coordinates(geoms) >= 2),
+            index=data_df.index
         )
         
         invalid_count = len(is_valid[~is_valid])
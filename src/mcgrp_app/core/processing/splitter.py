@@ -1,5 +1,6 @@
 # src\mcgrp_app\core\processing\splitter.py
 
+import numpy as np
 import pandas as pd
 from shapely.geometry import Point, LineString
 
@@ -138,6 +139,11 @@ class LineStringSplitter:
         # Recalcula geometria e 'total_dist'
         new_coords = [Point(p['geometry']).coords[0] for p in segment_points_dicts]
         new_street_props['geometry'] = LineString(new_coords)
+
+        # Distâncias (simétricas) e ângulos (atual -> próximo) de todos os segmentos de uma vez
+        coords_arr = np.asarray(new_coords, dtype=np.float64)
+        dists, angles = GeoCalculator.haversine_and_azimuth_vec(coords_arr[:-1], coords_arr[1:])
+        dists, angles = dists.tolist(), angles.tolist()
         
         # Cria os novos pontos
         total_dist_m = 0.0
@@ -155,20 +161,16 @@ class LineStringSplitter:
                 new_point_props['vertex_to'] = 0
                 new_point_props['eh_extremidade'] = 'yes'       # É o primeiro ponto
             else:
-                # Calcula distância do anterior (em metros)
-                prev_coord = new_coords[i-1]
-                curr_coord = new_coords[i]
-                dist_m = GeoCalculator.haversine_distance(curr_coord, prev_coord)
+                # Distância do anterior (em metros)
+                dist_m = dists[i - 1]
                 
                 new_point_props['distance'] = round(dist_m / 1000, GeoCalculator.PRECISION_DIGITS)
                 new_point_props['vertex_to'] = i - 1
                 total_dist_m += dist_m
             
             if i < len(segment_points_dicts) - 1:
-                # Calcula ângulo para o próximo
-                curr_coord = new_coords[i]
-                next_coord = new_coords[i+1]
-                angle = GeoCalculator.azimuth(curr_coord, next_coord)
+                # Ângulo para o próximo
+                angle = angles[i]
                 new_point_props['angle'] = round(angle, GeoCalculator.PRECISION_DIGITS)
                 new_point_props['angle_inv'] = round(GeoCalculator.azimuth_inverse(angle), GeoCalculator.PRECISION_DIGITS)
                 
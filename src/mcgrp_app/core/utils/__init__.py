@@ -2,11 +2,13 @@ from .fields import FieldConfigType, FieldsManager
 from .geo import GeoCalculator
 from .state import GraphState
 from .factory import GeoFactory
+from .tooltips import TooltipFormatter
 
 __all__ = [
     "FieldConfigType",
     "FieldsManager",
     "GeoCalculator",
     "GraphState",
-    "GeoFactory"
+    "GeoFactory",
+    "TooltipFormatter"
 ]
@@ -1,8 +1,10 @@
 # src\mcgrp_app\core\utils\factory.py
 
 import geopandas as gpd
+import numpy as np
 import pandas as pd
-from shapely.geometry.base import BaseGeometry
+import shapely
+from geopandas.array import GeometryDtype
 
 class GeoFactory:
     """
@@ -12,6 +14,18 @@ class GeoFactory:
     
     DEFAULT_CRS = "EPSG:4326"
 
+    @staticmethod
+    def _valid_geometry_mask(geoms: pd.Series) -> np.ndarray:
+        """
+        Retorna a máscara das linhas com geometria Shapely (não nula).
+        Usa o laço em C do Shapely 2.0 em vez de um isinstance por linha.
+        """
+        if isinstance(geoms.dtype, GeometryDtype):
+            # Coluna já é um GeometryArray: basta descartar os nulos
+            return geoms.notna().to_numpy()
+        
+        return shapely.is_geometry(geoms.to_numpy(dtype=object))
+
     @staticmethod
     def create_gdf(data: list[dict], geometry_col: str = 'geometry') -> gpd.GeoDataFrame:
         if not data:
@@ -30,16 +44,15 @@ class GeoFactory:
             raise ValueError(f"Coluna {geometry_col} ausente.")
         
         # Remove Nulos e Tipos Errados
-        valid_mask = df[geometry_col].notna() & \
-                     df[geometry_col].apply(lambda x: isinstance(x, BaseGeometry))
+        valid_mask = GeoFactory._valid_geometry_mask(df[geometry_col])
         
-        df_clean = df[valid_mask].copy()
+        # DataFrame recém-criado: só filtra (nova cópia) se houver inválidos
+        df_clean = df if valid_mask.all() else df[valid_mask]
 
         # Cria a GeoSeries explicitamente
         try:
-            gs = gpd.GeoSeries(df_clean[geometry_col])
+            gs = gpd.GeoSeries(df_clean[geometry_col], crs=GeoFactory.DEFAULT_CRS)
             gdf = gpd.GeoDataFrame(df_clean.drop(columns=[geometry_col]), geometry=gs)
-            gdf.crs = GeoFactory.DEFAULT_CRS
 
             return gdf
         except Exception as e:
@@ -48,9 +61,7 @@ class GeoFactory:
     @staticmethod
     def create_empty_gdf(crs: str = DEFAULT_CRS) -> gpd.GeoDataFrame:
         """Cria um GDF vazio com o CRS configurado."""
-        gdf = gpd.GeoDataFrame(columns=['geometry'], geometry='geometry')
-        gdf.crs = crs
-        return gdf
+        return gpd.GeoDataFrame(columns=['geometry'], geometry='geometry', crs=crs)
     
     @staticmethod
     def to_gdf(df: pd.DataFrame, crs: str = DEFAULT_CRS) -> gpd.GeoDataFrame:
@@ -65,15 +76,16 @@ class GeoFactory:
             # Retorna GDF vazio
             return gpd.GeoDataFrame(df, geometry='geometry')        # Sem CRS
         
-        local_df = df.copy()
+        # Sem cópia defensiva: o filtro e o drop abaixo já geram novos objetos,
+        # e o DataFrame de entrada nunca é modificado
+        local_df = df
         
         # Validação Básica
         if 'geometry' not in local_df.columns:
             raise ValueError("DataFrame não possui coluna 'geometry'.")
             
         # Sanitização (Remove Nulos e Não-Shapely)
-        valid_mask = local_df['geometry'].notna() & \
-                     local_df['geometry'].apply(lambda x: isinstance(x, BaseGeometry))
+        valid_mask = GeoFactory._valid_geometry_mask(local_df['geometry'])
         
         if not valid_mask.all():
             invalid_count = len(local_df) - valid_mask.sum()
@@ -81,10 +93,11 @@ class GeoFactory:
             local_df = local_df[valid_mask]
 
         try:
+            # CRS definido uma única vez na GeoSeries (sobrescreve o CRS herdado da coluna, se houver)
             geo_series = gpd.GeoSeries(local_df['geometry'])
+            geo_series.set_crs(crs, inplace=True, allow_override=True)
             df_data = local_df.drop(columns=['geometry'])
             gdf = gpd.GeoDataFrame(df_data, geometry=geo_series)
-            gdf.crs = crs
             
             return gdf
             
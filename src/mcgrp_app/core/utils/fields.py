@@ -1,6 +1,8 @@
 # src\mcgrp_app\core\utils\fields.py
 
+import numpy as np
 import pandas as pd
+import shapely
 from enum import Enum
 from typing import Set
 
@@ -182,10 +184,13 @@ class FieldsManager:
         elif 'geometry' in df.columns:
             # DataFrame Pandas
             # Filtra nulos antes de verificar o tipo
-            valid_geoms = df['geometry'].dropna()
-            if not valid_geoms.empty:
-                geom_types_present = set(valid_geoms.apply(lambda x: x.geom_type if hasattr(x, 'geom_type') else None).unique())
-                geom_types_present.discard(None)
+            valid_geoms = df['geometry'].dropna().to_numpy()
+            if len(valid_geoms) > 0:
+                # Tipos distintos via Shapely vetorizado (ignora objetos que não são geometrias);
+                # o nome é lido de uma única geometria representante de cada tipo
+                valid_geoms = valid_geoms[shapely.is_geometry(valid_geoms)]
+                _, first_pos = np.unique(shapely.get_type_id(valid_geoms), return_index=True)
+                geom_types_present = {valid_geoms[i].geom_type for i in first_pos}
         else:
             # Sem geometria
             return df
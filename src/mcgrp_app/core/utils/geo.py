@@ -3,7 +3,8 @@
 import math
 import numpy as np
 import pandas as pd
-from typing import List, Optional, Tuple
+import shapely
+from typing import Optional, Sequence, Tuple
 
 class GeoCalculator:
     """
@@ -54,28 +55,70 @@ class GeoCalculator:
 
         return azimuth_deg
 
+    @staticmethod
+    def haversine_and_azimuth_vec(coords1: np.ndarray, coords2: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Versão vetorizada de haversine_distance e azimuth, numa única passada
+        (reaproveita a conversão para radianos e os cossenos das latitudes).
+        Recebe dois arrays (N, 2) de pontos (lon, lat) e retorna as N distâncias
+        (em metros) e os N ângulos (0-360) de coords1 para coords2.
+        """
+        lon1, lat1 = np.radians(coords1[:, 0]), np.radians(coords1[:, 1])
+        lon2, lat2 = np.radians(coords2[:, 0]), np.radians(coords2[:, 1])
+
+        cos_lat1, cos_lat2 = np.cos(lat1), np.cos(lat2)
+
+        # Distância: diferenças tomadas em graus, como na versão escalar (resultados idênticos)
+        delta_phi = np.radians(coords2[:, 1] - coords1[:, 1])
+        delta_lambda_deg = np.radians(coords2[:, 0] - coords1[:, 0])
+
+        a = (np.sin(delta_phi/2)**2 +
+             cos_lat1 * cos_lat2 * np.sin(delta_lambda_deg/2)**2)
+        c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+        distances = np.round(GeoCalculator.EARTH_RADIUS * c, GeoCalculator.PRECISION_DIGITS)
+
+        # Azimute: diferença das longitudes já em radianos, como na versão escalar
+        delta_lambda = lon2 - lon1
+        x = np.sin(delta_lambda) * cos_lat2
+        y = (cos_lat1 * np.sin(lat2) -
+             np.sin(lat1) * cos_lat2 * np.cos(delta_lambda))
+        angles = (np.degrees(np.arctan2(x, y)) + 360) % 360
+
+        return distances, angles
+
     @staticmethod
     def azimuth_inverse(angle: float) -> float:
         """Calcula o ângulo inverso (oposto) de um ângulo azimuth dado."""
         return (angle + 180) % 360
     
     @staticmethod
-    def mean_angle_deg(degrees: List[float]) -> Optional[float]:
+    def mean_angle_deg(degrees: Sequence[float]) -> Optional[float]:
         """
         Calcula a média circular de um conjunto de ângulos em graus.
+        Aceita listas ou arrays NumPy.
         """
-        if not degrees:
+        if degrees is None or len(degrees) == 0:
             return None
 
-        radians = [math.radians(deg) for deg in degrees]
-        x_sum = sum(math.cos(rad) for rad in radians)
-        y_sum = sum(math.sin(rad) for rad in radians)
-
-        mean_rad = math.atan2(y_sum, x_sum)
-        mean_deg = math.degrees(mean_rad)
+        # Soma vetorial dos vetores unitários de cada ângulo, direto em arrays NumPy
+        radians = np.radians(np.asarray(degrees, dtype=float))
+        mean_rad = math.atan2(np.sin(radians).sum(), np.cos(radians).sum())
 
-        return mean_deg % 360
+        return math.degrees(mean_rad) % 360
     
+    @staticmethod
+    def mean_and_inverse_azimuth(degrees: Sequence[float]) -> Tuple[Optional[float], Optional[float]]:
+        """
+        Calcula, em uma única chamada, a média circular dos ângulos e o seu inverso,
+        ambos arredondados em PRECISION_DIGITS (o inverso parte da média arredondada).
+        """
+        if degrees is None or len(degrees) == 0:
+            return None, None
+
+        mean_deg = round(GeoCalculator.mean_angle_deg(degrees), GeoCalculator.PRECISION_DIGITS)
+        inv_deg = round((mean_deg + 180) % 360, GeoCalculator.PRECISION_DIGITS)
+        return mean_deg, inv_deg
+
     @staticmethod
     def are_coords_close(c1: Tuple[float, float], c2: Tuple[float, float]) -> bool:
         """
@@ -111,22 +154,30 @@ class GeoCalculator:
         return math.ceil(dist_km / vel * 3600)      # segundos
     
     @staticmethod
-    def create_map_points(data_points_df: pd.DataFrame) -> pd.DataFrame:
+    def rounded_coords(geometries) -> np.ndarray:
+        """
+        Coordenadas (lon, lat) de pontos como array (N, 2), arredondadas em PRECISION_DIGITS.
+        Extraídas em bloco, sem acessar cada objeto Shapely em Python.
+        """
+        return np.round(shapely.get_coordinates(np.asarray(geometries)), GeoCalculator.PRECISION_DIGITS)
+
+    @staticmethod
+    def create_map_points(data_points_df: pd.DataFrame, coords: Optional[np.ndarray] = None) -> pd.DataFrame:
         """
         Controí o map_points_df a partir do data_points_df.
         Agrupa pontos coincidentes geometricamente para visualização única.
+        'coords' (N, 2) permite reaproveitar coordenadas já arredondadas em PRECISION_DIGITS.
         """
         print("  Construindo DataFrame de pontos de mapa...")
 
-        df = data_points_df.copy()
+        df = data_points_df
         
-        # Cria uma coluna 'coord_tuple' para agrupamento
-        df['coord_tuple'] = df.geometry.apply(
-            lambda p: tuple(np.round(p.coords[0], GeoCalculator.PRECISION_DIGITS))
-        )
+        # Coordenadas arredondadas (lon, lat) para agrupamento
+        if coords is None:
+            coords = GeoCalculator.rounded_coords(df['geometry'].to_numpy())
         
-        # Agrupa pelo 'coord_tuple'
-        grouped = df.groupby('coord_tuple')
+        # Agrupa pelas coordenadas arredondadas (arrays como chaves: dispensa copiar o DataFrame)
+        grouped = df.groupby([coords[:, 0], coords[:, 1]])
         
         # Define como agregar cada coluna
         agg_rules = {
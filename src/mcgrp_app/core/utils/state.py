@@ -21,4 +21,21 @@ class GraphState:
     neighborhoods: pd.DataFrame
     
     # CRS padrão
-    crs: str = "EPSG:4326"
\ No newline at end of file
+    crs: str = "EPSG:4326"
+
+    # Próximos IDs/índices livres das ruas (cache do editor; None = recalcular pelos DataFrames)
+    next_street_id: Optional[int] = None
+    next_edge_index: Optional[int] = None
+    next_arc_index: Optional[int] = None
+
+    # Tooltips das ruas gerados a partir dos campos atuais (False = regerar todos, ex: estado lido de arquivo)
+    street_tooltips_current: bool = False
+
+    def reset_counters(self):
+        """
+        Invalida os contadores de IDs/índices.
+        Deve ser chamado quando ruas são removidas fora do GraphEditor.
+        """
+        self.next_street_id = None
+        self.next_edge_index = None
+        self.next_arc_index = None
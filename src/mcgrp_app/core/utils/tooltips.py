@@ -0,0 +1,137 @@
+# src\mcgrp_app\core\utils\tooltips.py
+
+import math
+
+import numpy as np
+import pandas as pd
+
+class TooltipFormatter:
+    """
+    Regras compartilhadas (pipeline e editor) para a formatação dos tooltips do mapa.
+    """
+    ONEWAY_TRUE_VALUES = frozenset({'yes', '1', 'true'})    # Valores de 'oneway' (minúsculos) que indicam arco
+
+    @classmethod
+    def oneway_flags(cls, oneway: pd.Series) -> np.ndarray:
+        """
+        Máscara das ruas de mão única. Normaliza (str + lower) apenas os valores
+        distintos da coluna, em vez de cada linha; nulos contam como 'no'.
+        """
+        codes, uniques = pd.factorize(oneway)
+        flags = np.array([cls.is_oneway(value) for value in uniques] + [False], dtype=bool)
+        return flags[codes]         # Código -1 (nulo) cai no False final
+
+    @classmethod
+    def is_oneway(cls, value) -> bool:
+        """Indica se um valor de 'oneway' representa uma rua de mão única."""
+        return str(value).lower() in cls.ONEWAY_TRUE_VALUES
+
+    @staticmethod
+    def _to_float(value) -> float:
+        """Converte um valor para float (NaN se ausente ou não numérico)."""
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return math.nan
+
+    @staticmethod
+    def _column(df: pd.DataFrame, col: str, default) -> list:
+        """Valores da coluna como lista (ou o valor padrão, se a coluna não existir)."""
+        return df[col].tolist() if col in df.columns else [default] * len(df)
+
+    @classmethod
+    def distance_label(cls, total_dist) -> str:
+        """Texto de 'total_dist_fmt' ('0.123 km'; 'N/A' sem distância)."""
+        dist = cls._to_float(total_dist)
+        return "N/A" if math.isnan(dist) else f"{dist:.3f} km"
+
+    @classmethod
+    def distance_labels(cls, df: pd.DataFrame) -> pd.Series:
+        """distance_label para todas as ruas de um DataFrame."""
+        return pd.Series(
+            [cls.distance_label(dist) for dist in cls._column(df, 'total_dist', 0.0)],
+            index=df.index, dtype=object
+        )
+
+    @classmethod
+    def street_html(cls, arc_flag: bool, arc, from_node, to_node, edge, rua, bairro, dist_label: str, custo) -> str:
+        """HTML do tooltip de uma rua, a partir dos valores dos seus campos."""
+        # Cabeçalho: arco (mão única) ou aresta
+        header = f"<b>Arco:</b> {arc} (De: {from_node}, Para: {to_node})" if arc_flag else f"<b>Aresta:</b> {edge}"
+
+        # Custo em segundos inteiros; 'N/A' se ausente ou negativo
+        custo = cls._to_float(custo)
+        custo_label = f"{int(custo)} s" if custo >= 0 else "N/A"     # NaN também falha a comparação
+
+        return (
+            f"{header}"
+            f"<br><b>Rua:</b> {rua}"
+            f"<br><b>Bairro:</b> {bairro}"
+            f"<br><b>Comprimento:</b> {dist_label}"
+            f"<br><b>Custo Travessia:</b> {custo_label}"
+        )
+
+    @classmethod
+    def street_tooltips(cls, df: pd.DataFrame, dist_labels: pd.Series = None) -> pd.Series:
+        """
+        HTML do tooltip de todas as ruas de um DataFrame (street_html por linha).
+        'dist_labels' permite reaproveitar o resultado de distance_labels.
+        """
+        if df.empty:
+            return pd.Series(index=df.index, dtype=object)
+
+        if dist_labels is None:
+            dist_labels = cls.distance_labels(df)
+        is_arc = cls.oneway_flags(df['oneway']).tolist() if 'oneway' in df.columns else [False] * len(df)
+
+        return pd.Series([
+            cls.street_html(*values)
+            for values in zip(
+                is_arc, cls._column(df, 'arc_index', '?'), cls._column(df, 'from_node', '?'),
+                cls._column(df, 'to_node', '?'), cls._column(df, 'edge_index', '?'),
+                cls._column(df, 'name', 'desconhecida'), cls._column(df, 'bairro', 'N/A'),
+                dist_labels.tolist(), cls._column(df, 'custo_travessia', None)
+            )
+        ], index=df.index, dtype=object)
+
+    @classmethod
+    def street_tooltip(cls, row_dict: dict) -> str:
+        """Tooltip de uma única rua (dict), com as mesmas regras de street_tooltips."""
+        try:
+            dist_label = cls.distance_label(row_dict.get('total_dist', 0.0))
+            row_dict['total_dist_fmt'] = dist_label
+            oneway = row_dict.get('oneway')
+            return cls.street_html(
+                pd.notna(oneway) and cls.is_oneway(oneway),
+                row_dict.get('arc_index', '?'), row_dict.get('from_node', '?'),
+                row_dict.get('to_node', '?'), row_dict.get('edge_index', '?'),
+                row_dict.get('name', 'desconhecida'), row_dict.get('bairro', 'N/A'),
+                dist_label, row_dict.get('custo_travessia')
+            )
+        except Exception:
+            return "Erro no Tooltip"
+
+    @classmethod
+    def node_html(cls, node, custo, depot) -> str:
+        """HTML do tooltip de um nó (índice e custo ausentes viram '?' e 0)."""
+        node = cls._to_float(node)
+        node_label = '?' if math.isnan(node) else int(node)
+        if depot == 'yes':
+            return f"<b>Depósito:</b> {node_label}"
+
+        custo = cls._to_float(custo)
+        return (
+            f"<b>Nó:</b> {node_label}"
+            f"<br><b>Custo de serviço:</b> {0 if math.isnan(custo) else int(custo)}s"
+        )
+
+    @classmethod
+    def node_tooltips(cls, df: pd.DataFrame) -> pd.Series:
+        """HTML do tooltip de todos os nós de um DataFrame (node_html por linha)."""
+        return pd.Series([
+            cls.node_html(*values)
+            for values in zip(
+                cls._column(df, 'node_index', None), cls._column(df, 'custo_servico', 0.0),
+                cls._column(df, 'depot', 'no')
+            )
+        ], index=df.index, dtype=object)
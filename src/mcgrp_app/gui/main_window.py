@@ -451,7 +451,8 @@ class MainWindow(QMainWindow):
             self.file_manager.neighborhoods_gdf = neigh_gdf
 
             # Conversão para DataFrames
-            state_crs = ms_gdf.crs if ms_gdf.crs else GeoFactory.DEFAULT_CRS
+            # CRS guardado como string (ex: "EPSG:4326"), evitando repassar o objeto pyproj
+            state_crs = ms_gdf.crs.to_string() if ms_gdf.crs else GeoFactory.DEFAULT_CRS
 
             ds_df = GeoFactory.from_gdf(ds_gdf)
             dp_df = GeoFactory.from_gdf(dp_gdf)
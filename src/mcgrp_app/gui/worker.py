@@ -553,6 +553,9 @@ class PipelineWorker(QObject):
             # Remove nós folhas
             analyzer.prune_dead_ends()
 
+            # Ruas removidas fora do editor: contadores de IDs/índices precisam ser recalculados
+            state.reset_counters()
+
             print(f"Worker: Grafo reduzido. Ruas restantes: {len(state.data_streets)}")
 
             # Atualiza o Estado (GraphState)
@@ -1,11 +1,12 @@
 # src\mcgrp_app\persistence\file_manager.py
 
 import os
+import numpy as np
 import pandas as pd
 import geopandas as gpd
 from pathlib import Path
 from typing import Dict, Optional, Union
-from shapely.geometry import LineString
+import shapely
 
 from PySide6.QtCore import QObject, Signal
 
@@ -210,9 +211,18 @@ class FileManager(QObject):
                 
                 # Filtra tipos específicos e validade lógica para ruas
                 if "line" in layer_name.lower() or "street" in layer_name.lower():
-                    subset = subset[subset.geometry.apply(
-                        lambda geom: isinstance(geom, LineString) and len(geom.coords) >= 2 and geom.length > 0
-                    )]
+                    # Checagens vetorizadas do shapely (GEOS), sem lambda por linha.
+                    # LinearRing também é aceito (subclasse de LineString, como no isinstance original)
+                    geoms = subset.geometry.to_numpy()
+                    is_line = (
+                        np.isin(
+                            shapely.get_type_id(geoms),
+                            (shapely.GeometryType.LINESTRING, shapely.GeometryType.LINEARRING)
+                        )
+                        & (shapely.get_num_coordinates(geoms) >= 2)
+                        & (shapely.length(geoms) > 0)
+                    )
+                    subset = subset[is_line]
                 
                 # Checagem final de validade
                 subset = subset[subset.geometry.is_valid]